@@ -0,0 +1,178 @@
+import glob
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+import numpy as np
+
+from history_store import ACTION_COLUMNS, COLUMNS
+
+# 每次动作估算的热量(千卡)：跳跃 / 下蹲 / 左移 / 右移
+CALORIES_PER_ACTION = np.array([0.5, 0.3, 0.1, 0.1])
+REACTION_BINS = np.arange(0, 525, 25)  # 反应时间直方图分箱(ms)
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def session_calories(stats):
+    counts = np.array([stats.get(c.upper(), 0) for c in ACTION_COLUMNS], dtype=np.float64)
+    return float(counts @ CALORIES_PER_ACTION)
+
+
+def _file_key(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _query_history(path, after_id=0):
+    cols = ", ".join(f'"{c}"' for c, _, _ in COLUMNS)
+    with closing(sqlite3.connect(path)) as conn:
+        rows = conn.execute(f"SELECT id, date, {cols} FROM sessions WHERE id > ? ORDER BY id", (after_id,)).fetchall()
+    if not rows:
+        return None
+    ids, dates, *values = zip(*rows)
+    data = {"id": np.array(ids, dtype=np.int64), "date": np.array(dates, dtype="datetime64[m]")}
+    for (name, _, _), column in zip(COLUMNS, values):
+        data[name] = np.array(column, dtype=np.int64)
+    return data
+
+
+def load_history(path):
+    # 历史记录整体读成列数组，按文件mtime缓存；记录只追加，文件变化时只读新增的行
+    try:
+        key = _file_key(path)
+    except OSError:
+        return None
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        # 文件变小说明被替换或清空过，整体重读
+        data = cached[1] if cached is not None and key[1] >= cached[0][1] else None
+        last_id = int(data["id"][-1]) if data is not None else 0
+        new = _query_history(path, last_id)
+        if new is not None and data is not None:
+            data = {name: np.concatenate([data[name], new[name]]) for name in data}
+        elif new is not None:
+            data = new
+        _cache[path] = (key, data)
+        return data
+
+
+def load_telemetry_dir(directory, limit=20):
+    # 最近limit局的遥测，按文件缓存(每局写完后不再变化)
+    from telemetry import load_telemetry
+    files = sorted(glob.glob(os.path.join(directory, "*.npz")) + glob.glob(os.path.join(directory, "*.parquet")),
+                   key=os.path.getmtime)[-limit:]
+    result = []
+    for path in files:
+        key = _file_key(path)
+        with _cache_lock:
+            cached = _cache.get(path)
+        if cached is None or cached[0] != key:
+            try:
+                cached = (key, load_telemetry(path))
+            except Exception as e:
+                print(f"Telemetry Load Error: {e}")
+                continue
+            with _cache_lock:
+                _cache[path] = cached
+        result.append(cached[1])
+    return result
+
+
+def rolling_mean(values, window):
+    # 前window-1个点用已有的数据求平均，长度与输入一致
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return values
+    sums = np.cumsum(values)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts = np.minimum(np.arange(1, values.size + 1), window)
+    return sums / counts
+
+
+def day_streaks(dates):
+    # 连续运动天数：返回(当前连续天数, 最长连续天数)，当前连续以最后一次运动的日期为准
+    days = np.asarray(dates).astype("datetime64[D]")
+    # 记录按时间追加，通常已有序，去重只需比较相邻元素，避免整体排序
+    if days.size > 1 and (days[1:] < days[:-1]).any():
+        days = np.sort(days)
+    days = days[np.r_[True, days[1:] != days[:-1]]] if days.size else days
+    if days.size == 0:
+        return 0, 0
+    breaks = np.flatnonzero(np.diff(days).astype(np.int64) != 1)
+    starts = np.r_[0, breaks + 1]
+    ends = np.r_[breaks + 1, days.size]
+    lengths = ends - starts
+    return int(lengths[-1]), int(lengths.max())
+
+
+def actions_per_minute(data):
+    duration = data["duration"].astype(np.float64)
+    apm = np.full(duration.shape, np.nan)
+    valid = duration > 0
+    apm[valid] = data["total"][valid] * 60.0 / duration[valid]
+    return apm
+
+
+def action_trends(data, last=20):
+    # 最近last局各动作次数的线性趋势(每局变化量)，一次最小二乘同时拟合四个动作
+    counts = np.stack([data[c] for c in ACTION_COLUMNS], axis=1)[-last:].astype(np.float64)
+    if len(counts) < 2:
+        return dict.fromkeys(ACTION_COLUMNS, 0.0)
+    x = np.arange(len(counts), dtype=np.float64)
+    design = np.stack([x, np.ones_like(x)], axis=1)
+    slopes = np.linalg.lstsq(design, counts, rcond=None)[0][0]
+    return dict(zip(ACTION_COLUMNS, slopes.tolist()))
+
+
+def reaction_times(data, max_ms=1000):
+    # 系统反应时间：阈值判定进入某动作 -> 实际发出该动作按键(含滤波/冷却造成的延后)，单位ms
+    raw, action, t = data["raw"], data["action"], data["t"]
+    if raw.size == 0:
+        return np.empty(0)
+    onset = np.r_[True, raw[1:] != raw[:-1]]
+    result = []
+    for code in range(1, len(ACTION_COLUMNS) + 1):
+        onset_t = t[onset & (raw == code)]
+        fired_t = t[data["fired"] & (action == code)]
+        if onset_t.size == 0 or fired_t.size == 0:
+            continue
+        idx = np.searchsorted(onset_t, fired_t, side="right") - 1
+        valid = idx >= 0
+        result.append((fired_t[valid] - onset_t[idx[valid]]) * 1000)
+    if not result:
+        return np.empty(0)
+    times = np.concatenate(result)
+    return times[times <= max_ms]
+
+
+def reaction_histogram(recordings, bins=REACTION_BINS):
+    times = np.concatenate([reaction_times(d) for d in recordings]) if recordings else np.empty(0)
+    counts, edges = np.histogram(times, bins=bins)
+    return counts, edges, times
+
+
+def summarize(data, window=7, chart_size=7):
+    # 结算页用到的全部统计
+    if data is None or data["id"].size == 0:
+        return None
+    totals = data["total"]
+    apm = actions_per_minute(data)
+    current, longest = day_streaks(data["date"])
+    return {
+        "sessions": int(totals.size),
+        "total_minutes": float(data["duration"].sum()) / 60.0,
+        "total_calories": float(np.stack([data[c] for c in ACTION_COLUMNS], axis=1).sum(axis=0)
+                                @ CALORIES_PER_ACTION),
+        "recent_totals": totals[-chart_size:],
+        "recent_rolling": rolling_mean(totals[-(window + chart_size - 1):], window)[-chart_size:],
+        "apm_last": float(apm[-1]) if np.isfinite(apm[-1]) else 0.0,
+        "apm_avg": float(np.nanmean(apm[-window:])) if np.isfinite(apm[-window:]).any() else 0.0,
+        "streak": current,
+        "longest_streak": longest,
+        "trends": action_trends(data),
+    }
@@ -0,0 +1,599 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from calibration import make_threshold_grid, load_labels, grid_search, best_thresholds
+from camera_probe import CameraProber, V4L2Enumerator, best_mode, default_enumerator
+from capture import open_source
+from controllers import HandController, BodyController
+from filters import make_action_filter, make_action_predictor
+from game_adapter import GameAdapter, _load_input_backend
+from governor import InferenceGovernor
+from lazy_import import EAGER_ENV
+from landmark_cache import LandmarkRecorder, load_landmarks, replay_codes, replay_actions, code_counts
+from metrics import LatencyTracker, stamp
+from utils import ConfigManager
+
+BASELINE_FILE = "benchmark_baseline.json"
+
+REPLAY_SPANS = [
+    ("preprocess", "capture", "preprocess"),
+    ("inference", "preprocess", "inference"),
+    ("decision", "inference", "decision"),
+    ("execute", "decision", "execute"),
+    ("frame_total", "capture", "execute"),
+]
+
+
+def make_detector(mode, settings, load_model=True):
+    if mode == "HAND":
+        return HandController(settings=settings, load_model=load_model)
+    return BodyController(settings=settings, load_model=load_model)
+
+
+# 离线回放：不需要摄像头，逐帧跑 预处理 -> 推理 -> 决策 -> 空按键后端
+# record_path不为空时同时把每帧关键点录制下来，供后续快速调参
+def replay_clip(source, mode, settings, max_frames=0, record_path=None):
+    cap = open_source(source)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open source: {source}")
+
+    clip_fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    detector = make_detector(mode, settings)
+    governor = InferenceGovernor(detector, settings["latency_budget_ms"]) if settings.get("governor_enabled") else None
+    recorder = LandmarkRecorder(mode, len(detector.LANDMARK_IDS), clip_fps) if record_path else None
+    adapter = GameAdapter(backend="null", sound=False)
+    # 回放时间轴从0开始，不能让初始的last_action_time=0把开头一个冷却窗口内的动作挡掉
+    adapter.last_action_time = float("-inf")
+    action_filter = make_action_filter(detector, settings)
+    if action_filter is not None:
+        adapter.cooldown = settings.get("filter_cooldown", adapter.cooldown)
+    predictor = make_action_predictor(detector, settings)
+    tracker = LatencyTracker()
+    actions = []
+
+    frames = 0
+    t_start = time.perf_counter()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        stamps = {}
+        stamp(stamps, "capture")
+        frame, frame_rgb = detector.preprocess(frame)
+        stamp(stamps, "preprocess")
+        if governor is not None:
+            points = governor.detect(frame_rgb, frames / clip_fps)
+        else:
+            points = detector.detect(frame_rgb)
+        stamp(stamps, "inference")
+        if action_filter is not None:
+            action, _ = action_filter.classify(points, frame.shape, frames / clip_fps)
+        else:
+            action, _ = detector.classify(points, frame.shape)
+        if predictor is not None:
+            action = predictor.update(points, action, frames / clip_fps)
+        stamp(stamps, "decision")
+        if recorder is not None:
+            recorder.add(points, frame.shape, frames / clip_fps)
+        # 冷却按素材时间轴计算，结果不受回放速度影响
+        if adapter.execute(action, now=frames / clip_fps):
+            actions.append([frames, action])
+        stamp(stamps, "execute")
+
+        for name, begin, end in REPLAY_SPANS:
+            tracker.record(name, stamps[end] - stamps[begin])
+        frames += 1
+        if max_frames and frames >= max_frames:
+            break
+    elapsed = time.perf_counter() - t_start
+    cap.release()
+    adapter.close()
+    if recorder is not None:
+        recorder.save(record_path)
+
+    return {
+        "source": str(source),
+        "mode": mode,
+        "frames": frames,
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else 0,
+        "latency": tracker.summary(rolling=False),
+        "actions": actions,
+    }
+
+
+def compare_baseline(result, baseline, tolerance):
+    # 返回回归问题列表，空列表表示通过
+    problems = []
+    if result["fps"] < baseline["fps"] * (1 - tolerance):
+        problems.append(f"fps {result['fps']} < baseline {baseline['fps']}")
+    cur_p95 = result["latency"].get("frame_total", {}).get("p95", 0)
+    base_p95 = baseline.get("latency", {}).get("frame_total", {}).get("p95", 0)
+    if base_p95 and cur_p95 > base_p95 * (1 + tolerance):
+        problems.append(f"frame_total p95 {cur_p95}ms > baseline {base_p95}ms")
+    if result["actions"] != baseline["actions"]:
+        problems.append("action sequence changed")
+    return problems
+
+
+def _load_json(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _print_replay(result):
+    print(f"[{result['mode']}] {result['source']}: {result['frames']} frames, {result['fps']} FPS")
+    for name, s in result["latency"].items():
+        print(f"  {name:<12} p50 {s['p50']:7.2f}ms  p95 {s['p95']:7.2f}ms  p99 {s['p99']:7.2f}ms")
+    print(f"  actions: {len(result['actions'])} -> {' '.join(a for _, a in result['actions'][:20])}")
+
+
+def cmd_replay(args):
+    settings = ConfigManager.load()
+    if args.roi:
+        settings["roi_enabled"] = True
+    # 基准测试默认关闭降级，保证结果可比；--budget 指定时开启
+    settings["governor_enabled"] = args.budget is not None
+    if args.no_filter:
+        settings["filter_enabled"] = False
+    if args.budget is not None:
+        settings["latency_budget_ms"] = args.budget
+    baseline = _load_json(args.baseline)
+    failed = False
+
+    for source in args.sources:
+        record_path = None
+        if args.record_dir:
+            name = os.path.splitext(os.path.basename(os.path.normpath(source)))[0]
+            record_path = os.path.join(args.record_dir, f"{args.mode}_{name}.npz")
+        result = replay_clip(source, args.mode, settings, args.max_frames, record_path)
+        _print_replay(result)
+        key = f"{args.mode}:{os.path.basename(os.path.normpath(source))}"
+
+        if args.save_baseline:
+            baseline[key] = result
+        elif key in baseline:
+            problems = compare_baseline(result, baseline[key], args.tolerance)
+            for p in problems:
+                print(f"  REGRESSION: {p}")
+            failed = failed or bool(problems)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+    return 1 if failed else 0
+
+
+# 关键点回放：跳过MediaPipe，只重跑阈值判定
+def cmd_landmarks(args):
+    settings = ConfigManager.load()
+    for key in ("jump_thresh", "duck_thresh", "left_thresh", "right_thresh"):
+        value = getattr(args, key)
+        if value is not None:
+            settings[key] = value
+    if args.lookahead is not None:
+        settings["predict_lookahead_ms"] = args.lookahead
+
+    for path in args.files:
+        record = load_landmarks(path)
+        detector = make_detector(record["mode"], settings, load_model=False)
+        points = record["points"]
+
+        t0 = time.perf_counter()
+        codes = replay_codes(detector, points)
+        elapsed = time.perf_counter() - t0
+        rate = len(points) / elapsed if elapsed > 0 else 0
+
+        adapter = GameAdapter(backend="null", sound=False)
+        fired = replay_actions(detector, adapter, record)
+
+        print(f"[{record['mode']}] {path}: {len(points)} frames, {rate / 1e6:.2f}M frames/s (vectorized)")
+        print(f"  per-frame actions: {code_counts(codes)}")
+        print(f"  fired (raw): {len(fired)} -> {' '.join(a for _, a in fired[:20])}")
+
+        # 对比平滑 + 滞回后的触发次数
+        action_filter = make_action_filter(detector, dict(settings, filter_enabled=True))
+        adapter = GameAdapter(backend="null", sound=False)
+        adapter.cooldown = settings.get("filter_cooldown", adapter.cooldown)
+        fired = replay_actions(detector, adapter, record, action_filter)
+        print(f"  fired (filtered): {len(fired)} -> {' '.join(a for _, a in fired[:20])}")
+
+        if args.predict:
+            predicted = _replay_predictive(detector, record, settings, action_filter)
+            _print_lead(fired, predicted, record["fps"] or 30)
+    return 0
+
+
+def _replay_predictive(detector, record, settings, action_filter):
+    predictor = make_action_predictor(detector, dict(settings, predictive_enabled=True))
+    action_filter.reset()
+    adapter = GameAdapter(backend="null", sound=False)
+    adapter.cooldown = settings.get("filter_cooldown", adapter.cooldown)
+    return replay_actions(detector, adapter, record, action_filter, predictor)
+
+
+def _print_lead(fired, predicted, fps):
+    # 按顺序把预测触发与普通触发配对(同一动作、60帧以内)，统计提前量
+    leads = []
+    j = 0
+    for frame, action in predicted:
+        while j < len(fired) and fired[j][0] < frame - 60:
+            j += 1
+        if j < len(fired) and fired[j][1] == action and fired[j][0] - frame <= 60:
+            leads.append(fired[j][0] - frame)
+            j += 1
+    print(f"  fired (predictive): {len(predicted)}, matched {len(leads)}")
+    if leads:
+        avg = sum(leads) / len(leads)
+        print(f"  average lead: {avg:.2f} frames ({avg / fps * 1000:.0f}ms)")
+
+
+# 阈值网格搜索：对照人工标注，一次性评估成千上万组阈值
+def cmd_sweep(args):
+    record = load_landmarks(args.file)
+    labels = load_labels(args.labels)
+    points = record["points"]
+    if len(labels) != len(points):
+        print(f"Label count {len(labels)} != frame count {len(points)}")
+        return 1
+
+    detector = make_detector(record["mode"], {}, load_model=False)
+    positions = points[:, detector.CENTER_INDEX]
+    grid = make_threshold_grid(args.step)
+
+    t0 = time.perf_counter()
+    scores = grid_search(positions, labels, grid, detector.pause_mask(points))
+    elapsed = time.perf_counter() - t0
+
+    print(f"[{record['mode']}] {len(grid)} threshold sets x {len(points)} frames in {elapsed:.2f}s")
+    for rank, (thresholds, score) in enumerate(best_thresholds(grid, scores, args.top), 1):
+        values = "  ".join(f"{k}={v:.2f}" for k, v in thresholds.items())
+        print(f"  #{rank} acc {score:.4f}  {values}")
+    return 0
+
+
+# 按键后端微基准：比较各后端单次按键(按下+松开)的调用开销
+def cmd_keys(args):
+    print(f"{args.count} presses of '{args.key}' per backend")
+    for name in args.backends:
+        try:
+            lib, loaded = _load_input_backend(name, args.device)
+        except Exception as e:
+            print(f"  {name:<14} unavailable: {e}")
+            continue
+        if loaded == "pyautogui":
+            lib.PAUSE = 0
+
+        times = np.empty(args.count)
+        try:
+            for i in range(args.count):
+                t0 = time.perf_counter()
+                lib.press(args.key)
+                times[i] = time.perf_counter() - t0
+        finally:
+            if loaded in ("uinput", "evdev"):
+                lib.close()
+        times *= 1e6
+        print(f"  {loaded:<14} mean {times.mean():8.1f}us  p50 {np.percentile(times, 50):8.1f}us  "
+              f"p99 {np.percentile(times, 99):8.1f}us")
+    return 0
+
+
+# 摄像头探测：首次探测与读缓存的耗时对比，并列出每个设备选中的模式
+def cmd_cameras(args):
+    enumerator = V4L2Enumerator(args.pattern) if args.pattern else default_enumerator()
+    prober = CameraProber(enumerator, cache_path=args.cache)
+    devices = prober.probe_all(refresh=True)
+    cold = prober.probe_time
+    prober.probe_all()
+    print(f"{len(devices)} devices, probe {cold * 1000:.1f}ms, cached {prober.probe_time * 1000:.1f}ms")
+    for device in devices:
+        mode = best_mode(device["modes"])
+        print(f"  [{device['index']}] {device['name']} ({device['path']}): {len(device['modes'])} modes")
+        if args.verbose:
+            for m in device["modes"]:
+                print(f"      {m['fourcc']:<5} {m['width']}x{m['height']}  {m['fps']}")
+        if mode:
+            print(f"      best: {mode['fourcc']} {mode['width']}x{mode['height']} @ {max(mode['fps'] or [0])}fps")
+    return 0
+
+
+# 配置保存：模拟拖动滑块，对比同步写盘与后台合并写盘时调用线程(即Tk线程)被阻塞的时间
+def cmd_config(args):
+    import tempfile
+    settings = ConfigManager.load()
+    with tempfile.TemporaryDirectory() as tmp:
+        ConfigManager.path = os.path.join(tmp, "user_config.json")
+        for label, save in (("sync", ConfigManager.save), ("async", ConfigManager.save_async)):
+            ConfigManager.writes = 0
+            times = np.empty(args.ticks)
+            for i in range(args.ticks):
+                settings["jump_thresh"] = round(0.1 + 0.4 * i / args.ticks, 3)
+                t0 = time.perf_counter()
+                save(settings)
+                times[i] = time.perf_counter() - t0
+                time.sleep(args.interval)
+            ConfigManager.flush()
+            with open(ConfigManager.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            times *= 1e6
+            print(f"  {label:<6} mean {times.mean():8.1f}us  p99 {np.percentile(times, 99):8.1f}us  "
+                  f"max {times.max():8.1f}us  disk writes {ConfigManager.writes:4d}  "
+                  f"final {'ok' if saved == settings else 'MISMATCH'}")
+    return 0
+
+
+def _summarize_telemetry(data):
+    from controllers import ACTIONS
+    from telemetry import TELEMETRY_DTYPE
+    duration = data["t"][-1] - data["t"][0] if len(data) > 1 else 0
+    seen = np.isfinite(data["x"]).mean() * 100 if len(data) else 0
+    print(f"  {len(data)} frames, {duration:.1f}s, {len(data) / max(duration, 1e-6):.1f} fps, person seen {seen:.0f}%")
+    # 原始判定进入某动作的次数 vs 实际按键次数，差值大说明被滤波/冷却/回中规则吞掉
+    onsets = np.r_[True, data["raw"][1:] != data["raw"][:-1]] if len(data) else np.zeros(0, bool)
+    for code, name in enumerate(ACTIONS[1:], start=1):
+        raw = int(np.count_nonzero(onsets & (data["raw"] == code)))
+        fired = int(np.count_nonzero(data["fired"] & (data["action"] == code)))
+        if raw or fired:
+            print(f"    {name:<7} raw onsets {raw:5d}  fired {fired:5d}")
+    for name in TELEMETRY_DTYPE.names[-3:]:
+        values = data[name][np.isfinite(data[name])]
+        if values.size:
+            p50, p95 = np.percentile(values, [50, 95])
+            print(f"    {name:<14} p50 {p50:6.2f}ms  p95 {p95:6.2f}ms")
+
+
+# 逐帧遥测：汇总已录制的文件；不给文件时测量写入开销(模拟游戏循环)
+def cmd_telemetry(args):
+    import tempfile
+    from telemetry import TelemetryLog, load_telemetry
+
+    for path in args.files:
+        print(path)
+        _summarize_telemetry(load_telemetry(path))
+    if args.files:
+        return 0
+
+    rng = np.random.default_rng(0)
+    points = rng.random((1024, 1, 2)).astype(np.float32)
+    actions = ["NEUTRAL", "JUMP", "DUCK", "LEFT", "RIGHT"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.npz")
+        log = TelemetryLog(path)
+        times = np.empty(args.frames)
+        for i in range(args.frames):
+            now = time.perf_counter()
+            stamps = {"capture": now, "preprocess": now + 0.001, "inference": now + 0.012, "decision": now + 0.0125}
+            action = actions[i % 5]
+            t0 = time.perf_counter()
+            log.add(now, points[i % 1024], 0, action, action, i % 7 == 0, stamps)
+            times[i] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        log.close()
+        close_time = time.perf_counter() - t0
+        data = load_telemetry(path)
+        times *= 1e6
+        print(f"{args.frames} frames -> {os.path.getsize(path) / 1024:.0f}KB ({len(data)} rows read back)")
+        print(f"  add  mean {times.mean():6.2f}us  p99 {np.percentile(times, 99):6.2f}us  max {times.max():8.1f}us")
+        print(f"  close {close_time * 1000:.1f}ms")
+    return 0
+
+
+def _timeit(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - t0) / repeat, result
+
+
+def _write_history_csv(path, sessions):
+    # 生成N局旧格式的历史CSV(每30分钟一局)，返回最后一局的时间
+    import csv
+    from datetime import datetime, timedelta
+    rng = np.random.default_rng(0)
+    counts = rng.integers(0, 20, size=(sessions, 4))
+    durations = rng.integers(10, 300, size=sessions)
+    start = datetime(2020, 1, 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Date", "Duration", "Jump", "Duck", "Left", "Right", "Total_Actions"])
+        for i in range(sessions):
+            date = (start + timedelta(minutes=30 * i)).strftime("%Y-%m-%d %H:%M")
+            writer.writerow([date, durations[i], *counts[i], counts[i].sum()])
+    return start + timedelta(minutes=30 * (sessions - 1))
+
+
+# 历史记录：生成N局的旧CSV，对比全量扫描CSV与SQLite的最近N条/区间/汇总查询
+def cmd_history(args):
+    import csv
+    import tempfile
+    from datetime import timedelta
+    from history_store import HistoryStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "game_history.csv")
+        last = _write_history_csv(csv_path, args.sessions)
+
+        def scan_csv():
+            with open(csv_path, "r", encoding="utf-8") as f:
+                return list(csv.DictReader(f))[-args.limit:]
+
+        csv_time, csv_rows = _timeit(scan_csv, 3)
+        t0 = time.perf_counter()
+        store = HistoryStore(os.path.join(tmp, "game_history.db"), migrate_from=csv_path)
+        migrate_time = time.perf_counter() - t0
+        recent_time, rows = _timeit(lambda: store.recent(args.limit), 100)
+        month_time, month = _timeit(lambda: store.range(last - timedelta(days=30)), 10)
+        weekly_time, weeks = _timeit(store.weekly, 3)
+        totals_time, totals = _timeit(store.totals, 3)
+
+        same = [r["Date"] for r in rows] == [r["Date"] for r in csv_rows]
+        print(f"{store.count()} sessions")
+        print(f"  csv full scan, last {args.limit}: {csv_time * 1000:9.2f}ms")
+        print(f"  sqlite migrate:            {migrate_time * 1000:9.2f}ms (once)")
+        print(f"  sqlite last {args.limit}:             {recent_time * 1000:9.3f}ms  {'match' if same else 'MISMATCH'}")
+        print(f"  sqlite last 30 days:       {month_time * 1000:9.3f}ms  {len(month)} rows")
+        print(f"  sqlite weekly totals:      {weekly_time * 1000:9.2f}ms  {len(weeks)} weeks")
+        print(f"  sqlite action totals:      {totals_time * 1000:9.2f}ms  jump={totals['Jump']}")
+    return 0 if same else 1
+
+
+# 结算页统计：首次全量读取、缓存命中、新增一局后增量读取的耗时
+def cmd_analytics(args):
+    import tempfile
+    import analytics
+    from history_store import HistoryStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "game_history.csv")
+        _write_history_csv(csv_path, args.sessions)
+        db_path = os.path.join(tmp, "game_history.db")
+        store = HistoryStore(db_path, migrate_from=csv_path)
+
+        def report():
+            return analytics.summarize(analytics.load_history(db_path))
+
+        cold_time, summary = _timeit(report, 1)
+        cached_time, _ = _timeit(report, 100)
+        store.add({"JUMP": 5, "DUCK": 3, "LEFT": 2, "RIGHT": 2, "TOTAL_TIME": 60})
+        incremental_time, summary = _timeit(report, 1)
+        print(f"{summary['sessions']} sessions")
+        print(f"  cold load + summary:        {cold_time * 1000:8.2f}ms")
+        print(f"  cached summary:             {cached_time * 1000:8.2f}ms")
+        print(f"  after 1 new session:        {incremental_time * 1000:8.2f}ms")
+        print(f"  streak {summary['streak']}d (longest {summary['longest_streak']}d), "
+              f"apm last {summary['apm_last']:.1f} avg {summary['apm_avg']:.1f}, "
+              f"rolling {np.round(summary['recent_rolling'], 1).tolist()}")
+    return 0
+
+
+def _profile_import(module, eager=False):
+    # 在新解释器里用 -X importtime 导入模块，返回 (总耗时秒, [(累计us, 自身us, 模块名)])
+    env = dict(os.environ)
+    env.pop(EAGER_ENV, None)
+    if eager:
+        env[EAGER_ENV] = "1"
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return float(proc.stdout.strip().splitlines()[-1]), rows
+
+
+# 启动耗时：对比延迟导入与全部立即导入，列出最耗时的顶层导入
+def cmd_startup(args):
+    for label, eager in (("lazy", False), ("eager", True)):
+        try:
+            elapsed, rows = _profile_import(args.module, eager)
+        except RuntimeError as e:
+            print(f"[{label}] import {args.module} failed: {e}")
+            return 1
+        print(f"[{label}] import {args.module}: {elapsed * 1000:.1f}ms, {len(rows)} modules")
+        # 缩进为0的是顶层导入，累计耗时包含其全部子模块
+        top = sorted((r for r in rows if not r[2].startswith("  ")), reverse=True)[:args.top]
+        for cumulative, self_us, name in top:
+            print(f"  {cumulative / 1000:8.1f}ms  {name.strip()}")
+        if args.output:
+            path = f"{os.path.splitext(args.output)[0]}_{label}.txt"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("cumulative_us\tself_us\tmodule\n")
+                f.writelines(f"{c}\t{s}\t{n}\n" for c, s, n in rows)
+            print(f"  profile saved to {path}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AirRunner 性能基准测试")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("replay", help="用录像/图片目录离线回放，统计FPS与延迟")
+    p.add_argument("sources", nargs="+", help="视频文件或图片帧目录")
+    p.add_argument("--mode", choices=["HAND", "BODY"], default="BODY")
+    p.add_argument("--max-frames", type=int, default=0)
+    p.add_argument("--baseline", default=BASELINE_FILE)
+    p.add_argument("--save-baseline", action="store_true", help="把本次结果写为基线")
+    p.add_argument("--tolerance", type=float, default=0.15, help="允许的性能波动比例")
+    p.add_argument("--record-dir", help="同时把每帧关键点录制为 .npz 到该目录")
+    p.add_argument("--roi", action="store_true", help="开启ROI裁剪推理")
+    p.add_argument("--budget", type=float, help="开启推理降级调度，指定延迟预算(ms)")
+    p.add_argument("--no-filter", action="store_true", help="关闭关键点平滑与滞回")
+    p.set_defaults(func=cmd_replay)
+
+    p = sub.add_parser("landmarks", help="回放录制好的关键点(.npz)，快速验证阈值")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--jump", dest="jump_thresh", type=float)
+    p.add_argument("--duck", dest="duck_thresh", type=float)
+    p.add_argument("--left", dest="left_thresh", type=float)
+    p.add_argument("--right", dest="right_thresh", type=float)
+    p.add_argument("--predict", action="store_true", help="同时回放预测触发，统计提前量")
+    p.add_argument("--lookahead", type=float, help="预测提前量(ms)")
+    p.set_defaults(func=cmd_landmarks)
+
+    p = sub.add_parser("sweep", help="在录制的关键点上网格搜索最佳阈值")
+    p.add_argument("file", help="关键点录制文件 .npz")
+    p.add_argument("--labels", required=True, help="逐帧标注：.npy编码数组 或 每行一个动作名的文本")
+    p.add_argument("--step", type=float, default=0.02)
+    p.add_argument("--top", type=int, default=5)
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser("keys", help="比较各输入后端的单次按键开销")
+    p.add_argument("--backends", nargs="+", default=["null", "uinput", "evdev", "pyautogui"])
+    p.add_argument("--device", help="uinput设备路径，可指向普通文件做模拟测试")
+    p.add_argument("--key", default="f24", help="测试按键，默认F24不影响桌面")
+    p.add_argument("--count", type=int, default=1000)
+    p.set_defaults(func=cmd_keys)
+
+    p = sub.add_parser("startup", help="分析启动时的导入耗时 (-X importtime)")
+    p.add_argument("--module", default="main", help="要导入的模块，默认启动器main")
+    p.add_argument("--top", type=int, default=10)
+    p.add_argument("--output", help="保存完整导入耗时表，文件名后会加 _lazy/_eager")
+    p.set_defaults(func=cmd_startup)
+
+    p = sub.add_parser("config", help="对比同步保存与后台合并保存配置时UI线程的阻塞时间")
+    p.add_argument("--ticks", type=int, default=200, help="模拟滑块回调次数")
+    p.add_argument("--interval", type=float, default=0.01, help="两次回调的间隔(秒)")
+    p.set_defaults(func=cmd_config)
+
+    p = sub.add_parser("telemetry", help="汇总逐帧遥测文件；不给文件时测量写入开销")
+    p.add_argument("files", nargs="*", help="遥测文件 .npz/.parquet")
+    p.add_argument("--frames", type=int, default=100000)
+    p.set_defaults(func=cmd_telemetry)
+
+    p = sub.add_parser("history", help="对比CSV全量扫描与SQLite历史记录的查询耗时")
+    p.add_argument("--sessions", type=int, default=100000)
+    p.add_argument("--limit", type=int, default=7)
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("analytics", help="结算页历史统计的加载/缓存/增量更新耗时")
+    p.add_argument("--sessions", type=int, default=100000)
+    p.set_defaults(func=cmd_analytics)
+
+    p = sub.add_parser("cameras", help="枚举摄像头并探测支持的格式/分辨率/帧率")
+    p.add_argument("--pattern", help="V4L2设备路径通配符，默认 /dev/video*")
+    p.add_argument("--cache", default="camera_cache_bench.json", help="探测缓存文件(默认不覆盖程序使用的缓存)")
+    p.add_argument("-v", "--verbose", action="store_true", help="列出全部模式")
+    p.set_defaults(func=cmd_cameras)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
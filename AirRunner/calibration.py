@@ -0,0 +1,53 @@
+import numpy as np
+
+from controllers import ACTIONS, THRESH_KEYS, classify_grid
+
+# 与设置页滑块范围一致
+THRESH_RANGES = {
+    "jump_thresh": (0.1, 0.5),
+    "duck_thresh": (0.5, 0.9),
+    "left_thresh": (0.2, 0.45),
+    "right_thresh": (0.55, 0.8),
+}
+
+
+def make_threshold_grid(step=0.02, ranges=None):
+    # 生成所有阈值组合 (M, 4)，去掉 jump>=duck 或 left>=right 的无效组合
+    ranges = ranges or THRESH_RANGES
+    axes = [np.round(np.arange(ranges[k][0], ranges[k][1] + step / 2, step), 4) for k in THRESH_KEYS]
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 4)
+    valid = (grid[:, 0] < grid[:, 1]) & (grid[:, 2] < grid[:, 3])
+    return grid[valid]
+
+
+def load_labels(path):
+    # .npy为ACTIONS编码数组；文本文件每行一个动作名，空行或"-"表示不参与评分
+    if path.endswith(".npy"):
+        return np.load(path).astype(np.int64)
+    labels = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            name = line.strip().upper()
+            labels.append(ACTIONS.index(name) if name in ACTIONS else -1)
+    return np.asarray(labels, dtype=np.int64)
+
+
+def grid_search(positions, labels, grid, pause_mask=None, chunk=256):
+    # 对每组阈值计算逐帧准确率，分块计算避免 (M, N) 矩阵占满内存
+    labels = np.asarray(labels)
+    scored = labels >= 0
+    positions = np.asarray(positions)[scored]
+    target = labels[scored]
+    if pause_mask is not None:
+        pause_mask = np.asarray(pause_mask)[scored]
+
+    scores = np.empty(len(grid), dtype=np.float64)
+    for start in range(0, len(grid), chunk):
+        codes = classify_grid(positions, grid[start:start + chunk], pause_mask)
+        scores[start:start + chunk] = (codes == target).mean(axis=1)
+    return scores
+
+
+def best_thresholds(grid, scores, top=1):
+    order = np.argsort(-scores, kind="stable")[:top]
+    return [(dict(zip(THRESH_KEYS, (float(v) for v in grid[i]))), float(scores[i])) for i in order]
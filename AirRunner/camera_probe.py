@@ -0,0 +1,306 @@
+import glob
+import json
+import os
+import re
+import struct
+import sys
+import threading
+import time
+
+CAMERA_CACHE_FILE = "camera_cache.json"  # 已探测过的设备能力，按设备身份缓存
+DEFAULT_SIZE = (640, 480)
+
+# V4L2 ioctl (linux/videodev2.h)，结构体按64位布局
+VIDIOC_QUERYCAP = 0x80685600
+VIDIOC_ENUM_FMT = 0xc0405602
+VIDIOC_ENUM_FRAMESIZES = 0xc02c564a
+VIDIOC_ENUM_FRAMEINTERVALS = 0xc034564b
+V4L2_BUF_TYPE_VIDEO_CAPTURE = 1
+V4L2_CAP_VIDEO_CAPTURE = 0x1
+V4L2_CAP_DEVICE_CAPS = 0x80000000
+V4L2_FRMSIZE_TYPE_DISCRETE = 1
+V4L2_FRMIVAL_TYPE_DISCRETE = 1
+
+_CAPABILITY = struct.Struct("16s32s32sIII12x")
+_FMTDESC = struct.Struct("III32sII12x")
+_FRMSIZE = struct.Struct("IIIIIIIII8x")  # index, pixel_format, type, 联合体(离散取前两个: 宽/高)
+_FRMIVAL = struct.Struct("IIIIIIIIIII8x")  # index, pixel_format, width, height, type, 联合体(离散取前两个: 分子/分母)
+
+# 连续/步进尺寸的设备只测试这些常用分辨率
+COMMON_SIZES = [(320, 240), (640, 480), (800, 600), (1280, 720), (1920, 1080)]
+
+
+def fourcc_str(code):
+    return struct.pack("<I", code).decode("ascii", "replace").strip()
+
+
+def _ioctl(fd, request, layout, *values):
+    import fcntl  # 仅Linux可用，模块本身在Windows上也要能导入
+    buf = bytearray(layout.pack(*values))
+    fcntl.ioctl(fd, request, buf)
+    return layout.unpack(buf)
+
+
+def _enum(fd, request, layout, *values):
+    # V4L2枚举接口：index从0递增，直到返回EINVAL
+    index = 0
+    while True:
+        try:
+            yield _ioctl(fd, request, layout, index, *values)
+        except OSError:
+            return
+        index += 1
+
+
+def _text(raw):
+    return raw.split(b"\0", 1)[0].decode("utf-8", "replace")
+
+
+# 直接用ioctl枚举 /dev/video*，不打开视频流，单个设备只需几毫秒
+class V4L2Enumerator:
+    def __init__(self, pattern="/dev/video*"):
+        self.pattern = pattern
+
+    def list_devices(self):
+        devices = []
+        for path in sorted(glob.glob(self.pattern), key=lambda p: int(re.sub(r"\D", "", p) or 0)):
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+            except OSError:
+                continue
+            try:
+                driver, card, bus, _, caps, device_caps = _ioctl(fd, VIDIOC_QUERYCAP, _CAPABILITY, b"", b"", b"", 0, 0, 0)
+            except OSError:
+                continue
+            finally:
+                os.close(fd)
+            if caps & V4L2_CAP_DEVICE_CAPS:
+                caps = device_caps
+            # 同一个摄像头常有额外的元数据节点，不能采集画面，跳过
+            if not caps & V4L2_CAP_VIDEO_CAPTURE:
+                continue
+            name, driver, bus = _text(card), _text(driver), _text(bus)
+            devices.append({
+                "index": int(re.sub(r"\D", "", os.path.basename(path)) or 0),
+                "path": path,
+                "name": name,
+                "identity": f"{driver}|{name}|{bus}",
+            })
+        return devices
+
+    def probe(self, device):
+        fd = os.open(device["path"], os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            modes = []
+            for fmt in _enum(fd, VIDIOC_ENUM_FMT, _FMTDESC, V4L2_BUF_TYPE_VIDEO_CAPTURE, 0, b"", 0, 0):
+                pixfmt = fmt[4]
+                for size in self._sizes(fd, pixfmt):
+                    modes.append({"fourcc": fourcc_str(pixfmt), "width": size[0], "height": size[1],
+                                  "fps": self._fps(fd, pixfmt, *size)})
+            return modes
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _sizes(fd, pixfmt):
+        sizes = []
+        for item in _enum(fd, VIDIOC_ENUM_FRAMESIZES, _FRMSIZE, pixfmt, 0, 0, 0, 0, 0, 0, 0):
+            if item[2] == V4L2_FRMSIZE_TYPE_DISCRETE:
+                sizes.append((item[3], item[4]))
+            else:
+                # 连续/步进: min_w, max_w, step_w, min_h, max_h, step_h
+                min_w, max_w, _, min_h, max_h, _ = item[3:9]
+                return [(w, h) for w, h in COMMON_SIZES if min_w <= w <= max_w and min_h <= h <= max_h]
+        return sizes
+
+    @staticmethod
+    def _fps(fd, pixfmt, width, height):
+        rates = []
+        for item in _enum(fd, VIDIOC_ENUM_FRAMEINTERVALS, _FRMIVAL, pixfmt, width, height, 0, 0, 0, 0, 0, 0, 0):
+            num, den = item[5], item[6]
+            if item[4] != V4L2_FRMIVAL_TYPE_DISCRETE:
+                # 连续/步进时item[5:7]是最短帧间隔，即最高帧率
+                rates.append(round(den / num, 2) if num else 0)
+                break
+            if num:
+                rates.append(round(den / num, 2))
+        return sorted(set(rates), reverse=True)
+
+
+# 其它平台回退：逐个打开摄像头编号，试设几种格式后读回实际生效的值(较慢，只在后台线程运行)
+class OpenCVEnumerator:
+    def __init__(self, max_index=3):
+        self.max_index = max_index
+
+    @staticmethod
+    def _open(index):
+        import cv2
+        return cv2.VideoCapture(index, cv2.CAP_DSHOW if sys.platform.startswith("win") else 0)
+
+    def list_devices(self):
+        devices = []
+        for index in range(self.max_index):
+            cap = self._open(index)
+            try:
+                if not cap.isOpened():
+                    continue
+                backend = cap.getBackendName()
+            finally:
+                cap.release()
+            devices.append({"index": index, "path": str(index), "name": f"Camera {index}",
+                            "identity": f"{backend}|{index}"})
+        return devices
+
+    def probe(self, device):
+        import cv2
+        cap = self._open(device["index"])
+        modes = {}
+        try:
+            for code in ("MJPG", "YUYV"):
+                for width, height in COMMON_SIZES:
+                    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*code))
+                    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+                    got = (fourcc_str(int(cap.get(cv2.CAP_PROP_FOURCC))), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                           int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+                    fps = cap.get(cv2.CAP_PROP_FPS)
+                    if got[1] and got[2]:
+                        modes[got] = [round(fps, 2)] if fps else []
+        finally:
+            cap.release()
+        return [{"fourcc": c, "width": w, "height": h, "fps": fps} for (c, w, h), fps in modes.items()]
+
+
+def default_enumerator():
+    if sys.platform.startswith("linux"):
+        return V4L2Enumerator()
+    return OpenCVEnumerator()
+
+
+def best_mode(modes, size=DEFAULT_SIZE):
+    # 延迟最低的模式：先取不小于目标的最小分辨率(像素越多预处理/推理越慢)，
+    # 同一分辨率下帧率最高(帧间隔最短) > 未压缩格式(省去MJPG解码)
+    if not modes:
+        return None
+    fits = [m for m in modes if m["width"] >= size[0] and m["height"] >= size[1]]
+    if fits:
+        area = min(m["width"] * m["height"] for m in fits)
+        fits = [m for m in fits if m["width"] * m["height"] == area]
+    else:
+        # 没有够大的模式时不限分辨率
+        fits = modes
+    return min(fits, key=lambda m: (-max(m["fps"] or [0]), m["fourcc"] == "MJPG", m["width"] * m["height"]))
+
+
+def apply_mode(cap, mode):
+    # 先设格式再设尺寸和帧率，部分驱动切换格式时会重置其它参数
+    import cv2
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*mode["fourcc"].ljust(4)[:4]))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, mode["width"])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, mode["height"])
+    if mode["fps"]:
+        cap.set(cv2.CAP_PROP_FPS, max(mode["fps"]))
+
+
+# 后台探测摄像头：设备列表每次都重新获取(很快)，格式/分辨率/帧率按设备身份缓存到磁盘，之后启动直接读缓存
+class CameraProber:
+    def __init__(self, enumerator=None, cache_path=CAMERA_CACHE_FILE):
+        self.enumerator = enumerator
+        self.cache_path = cache_path
+        self.devices = None  # [{"index", "path", "name", "identity", "modes"}]
+        self.error = None
+        self.probe_time = 0
+        self._thread = None
+        self._done = threading.Event()
+
+    def load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_cache(self, cache):
+        try:
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=4)
+        except OSError as e:
+            print(f"Camera cache save error: {e}")
+
+    def probe_all(self, refresh=False):
+        # refresh=True时忽略缓存重新探测
+        start = time.perf_counter()
+        enumerator = self.enumerator or default_enumerator()
+        cache = self.load_cache()
+        changed = False
+        devices = []
+        for device in enumerator.list_devices():
+            entry = cache.get(device["identity"])
+            if entry is None or refresh:
+                try:
+                    entry = {"name": device["name"], "modes": enumerator.probe(device)}
+                except OSError as e:
+                    print(f"Camera probe error ({device['path']}): {e}")
+                    entry = {"name": device["name"], "modes": []}
+                changed = True
+            if entry.get("index") != device["index"]:
+                entry["index"] = device["index"]
+                changed = True
+            cache[device["identity"]] = entry
+            devices.append(dict(device, modes=entry["modes"]))
+        if changed:
+            self.save_cache(cache)
+        self.devices = devices
+        self.probe_time = time.perf_counter() - start
+        return devices
+
+    def start(self, refresh=False):
+        if self.running:
+            return
+        self._done.clear()
+        self._thread = threading.Thread(target=self._run, args=(refresh,), daemon=True)
+        self._thread.start()
+
+    def _run(self, refresh):
+        try:
+            self.probe_all(refresh)
+        except Exception as e:
+            print(f"Camera probe error: {e}")
+            self.error = str(e)
+            self.devices = []
+        self._done.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def find(self, index):
+        for device in self.devices or []:
+            if device["index"] == index:
+                return device
+        return None
+
+    def best_mode_for(self, index, size=DEFAULT_SIZE):
+        # 还没探测完时只读缓存里记录的编号，不在游戏开始前重新枚举
+        device = self.find(index)
+        if device is None and self.devices is None:
+            device = next((e for e in self.load_cache().values() if e.get("index") == index), None)
+        return best_mode(device["modes"], size) if device else None
+
+
+def configure_capture(cap, index, prober=None, size=DEFAULT_SIZE):
+    # 按探测结果设置延迟最低的模式；没有探测结果时保持原先的固定640x480
+    mode = (prober or CameraProber()).best_mode_for(index, size)
+    if mode is None:
+        cap.set(3, size[0])
+        cap.set(4, size[1])
+        return None
+    apply_mode(cap, mode)
+    return mode
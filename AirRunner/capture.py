@@ -0,0 +1,186 @@
+import os
+import sys
+import threading
+import time
+
+import cv2
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+# 打开输入源：摄像头编号 / 视频文件 / 图片帧目录
+# paced=True时按素材帧率回放，模拟真实摄像头；基准测试用False全速读取
+def open_source(source, paced=False):
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        index = int(source)
+        if sys.platform.startswith("win"):
+            return cv2.VideoCapture(index, cv2.CAP_DSHOW)
+        return cv2.VideoCapture(index)
+
+    if os.path.isdir(source):
+        cap = FrameDirCapture(source)
+    else:
+        cap = cv2.VideoCapture(source)
+    return PacedCapture(cap) if paced else cap
+
+
+def is_camera_source(source):
+    return isinstance(source, int) or (isinstance(source, str) and source.isdigit())
+
+
+# 把一个目录下的图片按文件名顺序当作视频读取，接口与cv2.VideoCapture一致
+class FrameDirCapture:
+    def __init__(self, directory, fps=30):
+        self.directory = directory
+        self.fps = fps
+        self.files = sorted(f for f in os.listdir(directory) if f.lower().endswith(IMAGE_EXTS))
+        self.pos = 0
+        self.opened = len(self.files) > 0
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        if not self.opened or self.pos >= len(self.files):
+            return False, None
+        frame = cv2.imread(os.path.join(self.directory, self.files[self.pos]))
+        self.pos += 1
+        if frame is None:
+            return False, None
+        return True, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.files)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return self.pos
+        return 0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self.opened = False
+
+
+# 按素材帧率节流读取，让录像回放的节奏与实时摄像头一致
+class PacedCapture:
+    def __init__(self, cap, fps=None):
+        self.cap = cap
+        fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30
+        self.interval = 1.0 / fps
+        self._next = 0
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, image=None):
+        now = time.perf_counter()
+        if self._next > now:
+            time.sleep(self._next - now)
+        self._next = max(now, self._next) + self.interval
+        return self.cap.read(image)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+
+
+def frame_brightness(frame, step=8):
+    # 隔行隔列采样估算平均亮度，不做整帧灰度转换
+    sample = frame[::step, ::step]
+    b, g, r = sample.reshape(-1, 3).mean(axis=0)
+    return 0.114 * b + 0.587 * g + 0.299 * r
+
+
+# 独立采集线程
+# 单槽缓冲：只保留最新一帧，推理端永远拿到最新画面，旧帧直接覆盖
+# 内部三缓冲轮换(采集中/最新/读取方持有)，稳定后不再为每帧分配内存
+# read()返回的帧在下一次read()之前有效
+class FrameGrabber:
+    def __init__(self, cap):
+        self.cap = cap
+        self.running = False
+        self.dropped = 0  # 未被消费就被覆盖的帧数
+
+        self._cond = threading.Condition()
+        self._frame = None  # 最新帧
+        self._back = None  # 采集线程正在写入的缓冲
+        self._front = None  # 读取方当前持有的缓冲
+        self._frame_time = 0
+        self._read_time = 0
+        self._seq = 0
+        self._read_seq = 0
+        self._thread = None
+
+        # 尽量缩小驱动端缓冲，避免排队的旧帧
+        try:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        except Exception:
+            pass
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+        return self
+
+    def _worker(self):
+        while self.running and self.cap.isOpened():
+            ret, frame = self.cap.read(self._back)
+            if not ret:
+                break
+            stamp = time.perf_counter()
+            with self._cond:
+                if self._seq != self._read_seq:
+                    self.dropped += 1
+                # 被覆盖的旧帧缓冲留给下一次采集复用
+                self._back = self._frame
+                self._frame = frame
+                self._frame_time = stamp
+                self._seq += 1
+                self._cond.notify_all()
+
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+
+    def read(self, timeout=1.0):
+        # 与cap.read()接口一致，阻塞等待比上次更新的一帧
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq != self._read_seq or not self.running, timeout):
+                return False, None
+            if self._seq == self._read_seq:
+                return False, None
+            self._read_seq = self._seq
+            self._read_time = self._frame_time
+            # 交换：读取方拿走最新帧，归还上一次持有的缓冲
+            self._front, self._frame = self._frame, self._front
+            return True, self._front
+
+    @property
+    def frame_time(self):
+        # 最近一次read()返回帧的采集时间(perf_counter)
+        return self._read_time
+
+    def isOpened(self):
+        return self.running
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def release(self):
+        self.stop()
+        self.cap.release()
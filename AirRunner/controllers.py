@@ -1,8 +1,42 @@
 import cv2
-import mediapipe as mp
+import numpy as np
+
+from lazy_import import lazy_import
+from roi import RoiTracker
+
+# MediaPipe加载很慢，第一次构建模型时才真正导入
+mp = lazy_import("mediapipe")
+
+# 动作编码，批量判定/录制回放时使用
+ACTIONS = ["NEUTRAL", "JUMP", "DUCK", "LEFT", "RIGHT", "PAUSE"]
+THRESH_KEYS = ["jump_thresh", "duck_thresh", "left_thresh", "right_thresh"]
+
+
+def classify_grid(positions, thresholds, pause_mask=None):
+    # 向量化阈值判定，与逐帧的if/elif优先级一致：JUMP > DUCK > LEFT > RIGHT
+    # positions: (N, 2) 归一化坐标(x, y)，缺失帧为NaN
+    # thresholds: (M, 4) 每行为 jump/duck/left/right 阈值
+    # 返回 (M, N) 的ACTIONS编码矩阵
+    positions = np.asarray(positions, dtype=np.float64)
+    thresholds = np.asarray(thresholds, dtype=np.float64).reshape(-1, 4)
+    x = positions[None, :, 0]
+    y = positions[None, :, 1]
+    jump, duck, left, right = (thresholds[:, i:i + 1] for i in range(4))
+
+    # 按优先级从低到高依次覆盖
+    codes = np.where(x > right, np.int8(4), np.int8(0))
+    np.copyto(codes, np.int8(3), where=x < left)
+    np.copyto(codes, np.int8(2), where=y > duck)
+    np.copyto(codes, np.int8(1), where=y < jump)
+    if pause_mask is not None:
+        codes[:, pause_mask] = 5
+    return codes
 
 
 class BaseController:
+    # 需要保存的关键点编号，以及其中用于阈值判定的控制点下标
+    LANDMARK_IDS = [0]
+    CENTER_INDEX = 0
 
     def __init__(self, settings=None):
         # 默认设置
@@ -15,6 +49,33 @@ class BaseController:
         if settings:
             self.settings.update(settings)
 
+        self.model_complexity = 0
+        self.input_scale = 1.0  # 推理前缩放比例，由InferenceGovernor调节
+        self.roi = self._build_roi()
+
+    def _build_roi(self):
+        # 可选的ROI裁剪推理
+        if not self.settings.get("roi_enabled", False):
+            return None
+        return RoiTracker(
+            size=self.settings.get("roi_size", 0.5),
+            margin=self.settings.get("roi_margin", 0.1),
+            search_interval=self.settings.get("roi_search_interval", 30)
+        )
+
+    def apply_settings(self, settings):
+        # 复用已加载的模型开始新一局：更新阈值/ROI配置，清空上一局的跨帧状态
+        self.settings.update(settings)
+        self.input_scale = 1.0
+        self.roi = self._build_roi()
+        # 不开降级调度时恢复默认复杂度，不沿用上一局调度器切换到的模型
+        if not self.settings.get("governor_enabled", True):
+            self.set_model_complexity(0)
+
+    def update_thresholds(self, settings):
+        # 运行中热更新阈值：整体替换字典，决策线程不会读到一半新一半旧的阈值
+        self.settings = {**self.settings, **{k: settings[k] for k in THRESH_KEYS if k in settings}}
+
     def get_thresholds(self):
         return {
             "jump": self.settings["jump_thresh"],
@@ -23,92 +84,179 @@ class BaseController:
             "right": self.settings["right_thresh"]
         }
 
+    # 流水线拆分：预处理 -> 推理 -> 决策，可分别放在不同线程执行
+    def preprocess(self, frame, flip=True, out=None, out_rgb=None):
+        # 镜像 + BGR转RGB，返回(显示用BGR帧, 推理用RGB帧)
+        # out/out_rgb为预分配缓冲时直接写入，不产生新数组
+        if flip:
+            frame = cv2.flip(frame, 1, dst=out)
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out_rgb)
+        frame_rgb.flags.writeable = False
+        return frame, frame_rgb
+
+    def infer(self, frame_rgb):
+        raise NotImplementedError
+
+    def _build_model(self):
+        raise NotImplementedError
+
+    def set_model_complexity(self, complexity):
+        # 切换模型复杂度需要重建MediaPipe图
+        if complexity == self.model_complexity:
+            return
+        self.model_complexity = complexity
+        self._close_model()
+        self._set_model(self._build_model())
+
+    def _close_model(self):
+        pass
+
+    def _set_model(self, model):
+        raise NotImplementedError
+
+    def _infer_scaled(self, image):
+        if self.input_scale < 1.0:
+            image = cv2.resize(image, None, fx=self.input_scale, fy=self.input_scale, interpolation=cv2.INTER_AREA)
+        return self.infer(image)
+
+    def extract(self, results):
+        # 从推理结果中取出LANDMARK_IDS对应的归一化坐标，(K, 2)数组，未检测到返回None
+        raise NotImplementedError
+
+    def classify(self, points, shape):
+        # 阈值判定，只依赖关键点坐标，可直接用录制的数据回放
+        if points is None:
+            return "NEUTRAL", None
+        x, y = points[self.CENTER_INDEX]
+        data = (int(x * shape[1]), int(y * shape[0]))
+        return self._threshold_action(x, y), data
+
+    def _threshold_action(self, x, y):
+        s = self.settings
+        if y < s["jump_thresh"]:
+            return "JUMP"
+        elif y > s["duck_thresh"]:
+            return "DUCK"
+        elif x < s["left_thresh"]:
+            return "LEFT"
+        elif x > s["right_thresh"]:
+            return "RIGHT"
+        return "NEUTRAL"
+
+    def threshold_vector(self):
+        return [self.settings[k] for k in THRESH_KEYS]
+
+    def pause_mask(self, points):
+        # 与阈值无关的暂停判定(如握拳)，返回(N,)布尔数组或None
+        return None
+
+    def classify_batch(self, points):
+        # 向量化判定：points为(N, K, 2)，缺失帧为NaN，返回(N,)的ACTIONS编码
+        points = np.asarray(points)
+        return classify_grid(points[:, self.CENTER_INDEX], [self.threshold_vector()], self.pause_mask(points))[0]
+
+    def detect(self, frame_rgb):
+        # 推理 + 取关键点，开启ROI时只对裁剪区域推理，坐标换算回全图
+        if self.roi is None:
+            return self.extract(self._infer_scaled(frame_rgb))
+        image, pixel_box = self.roi.crop(frame_rgb)
+        points = self.roi.to_full(self.extract(self._infer_scaled(image)), pixel_box, frame_rgb.shape)
+        self.roi.update(None if points is None else points[self.CENTER_INDEX])
+        return points
+
+    def decide(self, results, shape):
+        return self.classify(self.extract(results), shape)
+
+    def process(self, frame):
+        _, frame_rgb = self.preprocess(frame, flip=False)
+        return self.classify(self.detect(frame_rgb), frame.shape)
+
 
 class BodyController(BaseController):
-    def __init__(self, detection_confidence=0.7, settings=None):
+    # 鼻尖
+    LANDMARK_IDS = [0]
+    CENTER_INDEX = 0
+
+    def __init__(self, detection_confidence=0.7, settings=None, load_model=True):
         super().__init__(settings)
+        self.detection_confidence = detection_confidence
+        # load_model=False时只保留决策逻辑，不加载MediaPipe模型(用于关键点回放)
+        self.pose = self._build_model() if load_model else None
+
+    def _build_model(self):
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            model_complexity=0,
-            min_detection_confidence=detection_confidence,
+        return self.mp_pose.Pose(
+            model_complexity=self.model_complexity,
+            min_detection_confidence=self.detection_confidence,
             min_tracking_confidence=0.5
         )
 
-    def process(self, frame):
-        frame.flags.writeable = False
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(frame_rgb)
-        frame.flags.writeable = True
-
-        action = "NEUTRAL"
-        body_data = None
+    def _close_model(self):
+        if self.pose is not None:
+            self.pose.close()
 
-        # 读取设置
-        s = self.settings
-
-        if results.pose_landmarks:
-            landmarks = results.pose_landmarks.landmark
-            # 鼻尖控制
-            nose = landmarks[0]
-            x, y = nose.x, nose.y
-            body_data = (int(x * frame.shape[1]), int(y * frame.shape[0]))
+    def _set_model(self, model):
+        self.pose = model
 
-            if y < s["jump_thresh"]:
-                action = "JUMP"
-            elif y > s["duck_thresh"]:
-                action = "DUCK"
-            elif x < s["left_thresh"]:
-                action = "LEFT"
-            elif x > s["right_thresh"]:
-                action = "RIGHT"
+    def infer(self, frame_rgb):
+        return self.pose.process(frame_rgb)
 
-        return action, body_data
+    def extract(self, results):
+        if not results.pose_landmarks:
+            return None
+        landmarks = results.pose_landmarks.landmark
+        return np.array([[landmarks[i].x, landmarks[i].y] for i in self.LANDMARK_IDS])
 
 
 class HandController(BaseController):
-    def __init__(self, detection_confidence=0.7, settings=None):
+    # 6~16号点：食指/中指/无名指的指节与指尖，9号为中指根部(控制点)
+    LANDMARK_IDS = list(range(6, 17))
+    CENTER_INDEX = 3
+    # 握拳检测，指尖:8,12,16 指关节:6,10,14 (转换为LANDMARK_IDS中的下标)
+    TIPS = [2, 6, 10]
+    PIPS = [0, 4, 8]
+
+    def __init__(self, detection_confidence=0.7, settings=None, load_model=True):
         super().__init__(settings)
+        self.detection_confidence = detection_confidence
+        self.hands = self._build_model() if load_model else None
+
+    def _build_model(self):
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            model_complexity=0,
+        return self.mp_hands.Hands(
+            model_complexity=min(self.model_complexity, 1),
             max_num_hands=1,
-            min_detection_confidence=detection_confidence,
+            min_detection_confidence=self.detection_confidence,
             min_tracking_confidence=0.5
         )
 
-    def process(self, frame):
-        frame.flags.writeable = False
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(frame_rgb)
-        frame.flags.writeable = True
+    def _close_model(self):
+        if self.hands is not None:
+            self.hands.close()
+
+    def _set_model(self, model):
+        self.hands = model
+
+    def infer(self, frame_rgb):
+        return self.hands.process(frame_rgb)
+
+    def extract(self, results):
+        if not results.multi_hand_landmarks:
+            return None
+        landmarks = results.multi_hand_landmarks[-1].landmark
+        return np.array([[landmarks[i].x, landmarks[i].y] for i in self.LANDMARK_IDS])
+
+    def classify(self, points, shape):
+        if points is None:
+            return "NEUTRAL", None
+        folded = sum([1 for t, p in zip(self.TIPS, self.PIPS) if points[t][1] > points[p][1]])
+        action, hand_data = super().classify(points, shape)
+        if folded >= 3:
+            action = "PAUSE"
+        return action, hand_data
+
+    def pause_mask(self, points):
+        points = np.asarray(points)
+        folded = (points[:, self.TIPS, 1] > points[:, self.PIPS, 1]).sum(axis=1)
+        return folded >= 3
 
-        action = "NEUTRAL"
-        hand_data = None
-        s = self.settings
-        h, w, _ = frame.shape
-
-        if results.multi_hand_landmarks:
-            for hand_lms in results.multi_hand_landmarks:
-                # 握拳检测
-                tips = [8, 12, 16]
-                pips = [6, 10, 14]
-                folded = sum([1 for t, p in zip(tips, pips) if hand_lms.landmark[t].y > hand_lms.landmark[p].y])
-
-                # 中指根部坐标
-                lm = hand_lms.landmark[9]
-                cx, cy = lm.x, lm.y
-                hand_data = (int(cx * w), int(cy * h))
-
-                if folded >= 3:
-                    action = "PAUSE"
-                else:
-                    if cy < s["jump_thresh"]:
-                        action = "JUMP"
-                    elif cy > s["duck_thresh"]:
-                        action = "DUCK"
-                    elif cx < s["left_thresh"]:
-                        action = "LEFT"
-                    elif cx > s["right_thresh"]:
-                        action = "RIGHT"
-
-        return action, hand_data
\ No newline at end of file
@@ -0,0 +1,58 @@
+import threading
+
+import numpy as np
+
+from controllers import HandController, BodyController
+from process_backend import ProcessDetector
+
+
+# 识别器注册表：每种模式只加载一次MediaPipe模型，跨游戏会话和校准向导复用
+# 启动页预热后，开始游戏时直接拿到已经跑过几帧的模型，倒计时阶段不再卡顿
+class DetectorRegistry:
+    _detectors = {}  # (模式, 推理后端) -> 识别器
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _create(mode, backend, settings):
+        if backend == "process":
+            return ProcessDetector(mode, settings)
+        if mode == "HAND":
+            return HandController(settings=settings)
+        return BodyController(settings=settings)
+
+    @classmethod
+    def get(cls, mode, settings=None, backend="thread"):
+        # 返回已加载的识别器，并按本局设置重置阈值/ROI
+        settings = settings or {}
+        key = (mode, backend)
+        with cls._lock:
+            detector = cls._detectors.get(key)
+            if isinstance(detector, ProcessDetector) and not detector.is_alive():
+                detector.close()
+                detector = None
+            if detector is None:
+                detector = cls._create(mode, backend, settings)
+                cls._detectors[key] = detector
+                return detector
+        detector.apply_settings(settings)
+        return detector
+
+    @classmethod
+    def warm_up(cls, modes=("BODY", "HAND"), settings=None, backend="thread", frames=3):
+        # 用空白合成帧跑几次推理，完成MediaPipe图初始化和TFLite内存分配
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        for mode in modes:
+            detector = cls.get(mode, settings, backend)
+            for _ in range(frames):
+                detector.detect(frame)
+
+    @classmethod
+    def close_all(cls):
+        with cls._lock:
+            detectors = list(cls._detectors.values())
+            cls._detectors.clear()
+        for detector in detectors:
+            if isinstance(detector, ProcessDetector):
+                detector.close()
+            else:
+                detector._close_model()
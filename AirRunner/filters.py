@@ -0,0 +1,173 @@
+import math
+from collections import deque
+
+import numpy as np
+
+# 预测触发时各动作对应的判定轴 (0: x, 1: y)
+AXIS = {"JUMP": 1, "DUCK": 1, "LEFT": 0, "RIGHT": 0}
+
+# 动作优先级，与阈值判定的if/elif顺序一致(握拳暂停最优先)，数值越小越优先
+PRIORITY = {"PAUSE": 0, "JUMP": 1, "DUCK": 2, "LEFT": 3, "RIGHT": 4}
+
+
+def _alpha(cutoff, dt):
+    # 一阶低通的平滑系数，cutoff可以是数组(逐坐标不同截止频率)
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+# One Euro 滤波：静止时强平滑去抖，快速移动时自动提高截止频率，减少滞后
+# 对 (K, 2) 关键点数组逐坐标滤波
+class OneEuroFilter:
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta  # 速度越快截止频率越高
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.x = None
+        self.dx = None  # 平滑后的速度(归一化坐标/秒)
+        self.t = None
+
+    def __call__(self, x, t):
+        x = np.asarray(x, dtype=np.float64)
+        if self.x is None or self.x.shape != x.shape:
+            self.x = x.copy()
+            self.dx = np.zeros_like(x)
+            self.t = t
+            return self.x
+        dt = t - self.t
+        if dt <= 0:
+            return self.x
+
+        self.dx = self.dx + _alpha(self.d_cutoff, dt) * ((x - self.x) / dt - self.dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx)
+        self.x = self.x + _alpha(cutoff, dt) * (x - self.x)
+        self.t = t
+        return self.x
+
+
+# 决策前的滤波阶段：关键点先经One Euro平滑，再按各阈值的滞回带判定
+# 进入动作仍在阈值处触发，退出需要越过阈值再回退band，阈值附近的抖动不会反复 NEUTRAL<->JUMP
+class ActionFilter:
+    def __init__(self, detector, min_cutoff=1.0, beta=10.0, band=0.03):
+        self.detector = detector
+        self.band = band
+        self.smoother = OneEuroFilter(min_cutoff, beta)
+        self.held = "NEUTRAL"
+
+    def reset(self):
+        self.smoother.reset()
+        self.held = "NEUTRAL"
+
+    def _in_band(self, action, x, y):
+        s = self.detector.settings
+        if action == "JUMP":
+            return y < s["jump_thresh"] + self.band
+        if action == "DUCK":
+            return y > s["duck_thresh"] - self.band
+        if action == "LEFT":
+            return x < s["left_thresh"] + self.band
+        if action == "RIGHT":
+            return x > s["right_thresh"] - self.band
+        return False
+
+    def classify(self, points, shape, t):
+        # 与detector.classify返回值一致，t为帧时间(秒)
+        if points is None:
+            # 目标丢失时清空状态，重新出现时不沿用旧的速度
+            self.reset()
+            return self.detector.classify(None, shape)
+
+        smoothed = self.smoother(points, t)
+        action, data = self.detector.classify(smoothed, shape)
+        x, y = smoothed[self.detector.CENTER_INDEX]
+        held = self.held
+        if held != action and self._in_band(held, x, y) and PRIORITY[held] < PRIORITY.get(action, len(PRIORITY)):
+            action = held
+        self.held = action
+        return action, data
+
+
+# 预测触发：对最近几帧控制点做线性拟合估计速度，预计lookahead秒内越过阈值就提前触发
+# 置信门控：只有速度足够快且拟合优度R²足够高(运动方向一致)才触发，随机抖动不会误触
+# 之后真正越过阈值时动作不变，GameAdapter的回中规则保证同一动作不会重复触发
+# 动作结束后回中的过程速度也很快，refractory秒内不预测同一轴上的相反动作(如跳完回落被当成下蹲)
+class ActionPredictor:
+    def __init__(self, detector, lookahead=0.1, window=4, min_speed=0.5, min_r2=0.85, refractory=0.4):
+        self.detector = detector
+        self.lookahead = lookahead
+        self.min_speed = min_speed  # 归一化坐标/秒
+        self.min_r2 = min_r2
+        self.refractory = refractory
+        self.history = deque(maxlen=window)
+        self.last_active = (None, 0.0)  # 最近一次非NEUTRAL动作及其时间
+
+    def reset(self):
+        self.history.clear()
+        self.last_active = (None, 0.0)
+
+    def _fit(self):
+        # 最小二乘直线拟合，返回 (最新时刻的拟合位置, 速度, 各轴R²)
+        t = np.array([h[0] for h in self.history])
+        p = np.array([h[1] for h in self.history])
+        t = t - t.mean()
+        var = (t * t).sum()
+        if var <= 0:
+            return None
+        mean = p.mean(axis=0)
+        velocity = (t[:, None] * (p - mean)).sum(axis=0) / var
+        resid = ((p - mean - np.outer(t, velocity)) ** 2).sum(axis=0)
+        total = ((p - mean) ** 2).sum(axis=0)
+        r2 = np.where(total > 0, 1 - resid / np.maximum(total, 1e-12), 0.0)
+        return mean + velocity * t[-1], velocity, r2
+
+    def update(self, points, action, t):
+        # 输入当前帧判定结果，返回可能被提前的动作；只会把NEUTRAL提前为某个动作
+        if points is None:
+            self.reset()
+            return action
+        self.history.append((t, np.asarray(points[self.detector.CENTER_INDEX], dtype=np.float64)))
+        if action != "NEUTRAL":
+            self.last_active = (action, t)
+            return action
+        if len(self.history) < self.history.maxlen:
+            return action
+
+        fit = self._fit()
+        if fit is None:
+            return action
+        position, velocity, r2 = fit
+        x, y = position + velocity * self.lookahead
+        predicted = self.detector._threshold_action(x, y)
+        if predicted not in AXIS:
+            return action
+        axis = AXIS[predicted]
+        if abs(velocity[axis]) < self.min_speed or r2[axis] < self.min_r2:
+            return action
+        last, last_t = self.last_active
+        if last in AXIS and last != predicted and AXIS[last] == axis and t - last_t < self.refractory:
+            return action
+        return predicted
+
+
+def make_action_predictor(detector, settings):
+    if not settings.get("predictive_enabled", False):
+        return None
+    return ActionPredictor(
+        detector,
+        lookahead=settings.get("predict_lookahead_ms", 100) / 1000,
+        min_speed=settings.get("predict_min_speed", 0.5)
+    )
+
+
+def make_action_filter(detector, settings):
+    if not settings.get("filter_enabled", True):
+        return None
+    return ActionFilter(
+        detector,
+        min_cutoff=settings.get("filter_min_cutoff", 1.0),
+        beta=settings.get("filter_beta", 10.0),
+        band=settings.get("hysteresis_band", 0.03)
+    )
@@ -1,9 +1,62 @@
 import sys
 import time
 import threading
+from collections import deque
 from utils import AudioManager
 
-def _load_input_backend():
+# 空输入后端：不发送任何按键，只记录，用于离线回放和基准测试
+class NullInput:
+    PAUSE = 0
+
+    def __init__(self):
+        self.pressed = []
+
+    def press(self, key):
+        self.pressed.append(key)
+
+    def keyDown(self, key):
+        self.pressed.append(key)
+
+    def keyUp(self, key):
+        pass
+
+
+def _load_linux_backend(name, device):
+    # Linux下优先用虚拟键盘(python-evdev / 直接写uinput)，绕过X11；没有权限时回退pyautogui
+    from uinput_backend import UinputKeyboard, EvdevKeyboard, uinput_available
+    if name is None and not uinput_available(device):
+        return None
+    if name in (None, "evdev"):
+        try:
+            return EvdevKeyboard(device), "evdev"
+        except Exception as e:
+            if name == "evdev":
+                raise
+            print(f"evdev backend unavailable: {e}")
+    try:
+        return UinputKeyboard(device), "uinput"
+    except OSError as e:
+        if name == "uinput":
+            raise
+        print(f"uinput backend unavailable: {e}")
+    return None
+
+
+def _load_input_backend(name=None, device=None):
+    # name为None时自动选择；也可指定 "null" / "uinput" / "evdev" / "pyautogui" / "pydirectinput"
+    if name == "null":
+        return NullInput(), "null"
+
+    if sys.platform.startswith("linux") and name in (None, "uinput", "evdev"):
+        from uinput_backend import DEFAULT_DEVICE
+        loaded = _load_linux_backend(name, device or DEFAULT_DEVICE)
+        if loaded is not None:
+            return loaded
+
+    if name == "pyautogui":
+        import pyautogui as input_lib
+        return input_lib, "pyautogui"
+
     if sys.platform.startswith("win"):
         try:
             import pydirectinput as input_lib
@@ -16,6 +69,79 @@ def _load_input_backend():
     return input_lib, "pyautogui"
 
 
+# 按键注入线程：单个常驻线程按顺序发送按键，替代每次按键新建线程
+# 队列有界，积压时丢弃最旧的单击；keyDown/keyUp不丢弃，保证按键不会卡住
+class KeyInjector:
+    def __init__(self, input_lib, tracker=None, maxsize=16):
+        self.input_lib = input_lib
+        self.tracker = tracker
+        self.maxsize = maxsize
+        self._events = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.closed = False
+        self.dropped = 0
+        self.coalesced = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, daemon=True)
+            self._thread.start()
+
+    def submit(self, kind, key, stamps=None):
+        # kind: "press" / "down" / "up"
+        with self._cond:
+            if self.closed:
+                return False
+            # 合并：队尾已有同一个未发出的单击时不再重复排队
+            if kind == "press" and self._events and self._events[-1][:2] == ("press", key):
+                self.coalesced += 1
+                return False
+            if len(self._events) >= self.maxsize:
+                for i, event in enumerate(self._events):
+                    if event[0] == "press":
+                        del self._events[i]
+                        self.dropped += 1
+                        break
+            self._events.append((kind, key, stamps))
+            self._ensure_started()
+            self._cond.notify()
+        return True
+
+    def _send(self, kind, key):
+        if kind == "press":
+            self.input_lib.press(key)
+        elif kind == "down":
+            self.input_lib.keyDown(key)
+        else:
+            self.input_lib.keyUp(key)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._events or self.closed)
+                if not self._events:
+                    return
+                kind, key, stamps = self._events.popleft()
+            try:
+                self._send(kind, key)
+            except Exception as e:
+                print(f"Key press error: {e}")
+                continue
+            if stamps is not None:
+                stamps["dispatch"] = time.perf_counter()
+                if self.tracker is not None:
+                    self.tracker.record_dispatch(stamps)
+
+    def close(self, timeout=1.0):
+        # 发完已排队的按键后退出
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
 class GameAdapter:
     KEY_MAPS = {
         "arrows": {
@@ -34,11 +160,17 @@ class GameAdapter:
         },
     }
 
-    def __init__(self, cooldown=0.15, profile="arrows"):
+    def __init__(self, cooldown=0.15, profile="arrows", tracker=None, backend=None, sound=True, hold_actions=("DUCK",),
+                 device=None):
         self.last_action_time = 0
+        self.tracker = tracker  # 可选的LatencyTracker，记录按键发出时间
         self.cooldown = cooldown
+        self.sound = sound
         self.last_action = "NEUTRAL"
-        self.input_lib, self.backend = _load_input_backend()
+        self.hold_actions = set(hold_actions)  # 这些动作用keyDown按住，动作结束时keyUp
+        self.held_key = None
+        self.input_lib, self.backend = _load_input_backend(backend, device)  # device: uinput设备路径
+        self.injector = KeyInjector(self.input_lib, tracker)
         self.set_profile(profile)
 
         # 统计数据字典
@@ -64,39 +196,46 @@ class GameAdapter:
             raise ValueError(f"Unknown key profile: {profile}")
         self.key_map = self.KEY_MAPS[profile]
 
-    def _press_worker(self, key):
-        try:
-            self.input_lib.press(key)
-        except Exception as e:
-            print(f"Key press error: {e}")
+    def _release_held(self):
+        if self.held_key is not None:
+            self.injector.submit("up", self.held_key)
+            self.held_key = None
+
+    def execute(self, action, stamps=None, now=None):
+        # now: 回放时传入素材时间轴，保证冷却判定与回放速度无关
+        current_time = time.time() if now is None else now
 
-    def execute(self, action):
-        current_time = time.time()
+        # 按住的动作结束时松开按键
+        if self.held_key is not None and action != self.last_action:
+            self._release_held()
 
         # 过滤：如果是中立或未检测到人，重置状态
         if action == "NEUTRAL" or action == "NO_HAND":
             self.last_action = "NEUTRAL"
-            return
+            return False
 
         # 防止连发，必须回中才能再次触发
         if self.last_action != "NEUTRAL":
-            return
+            return False
 
         # 冷却：防止抖动导致的误触
         if current_time - self.last_action_time < self.cooldown:
-            return
+            return False
 
         # 执行动作
         if action in self.key_map:
             key = self.key_map[action]
 
             # 播放对应的音效
-            AudioManager.play(action)
+            if self.sound:
+                AudioManager.play(action)
 
-            # 启动守护线程按键
-            t = threading.Thread(target=self._press_worker, args=(key,))
-            t.daemon = True
-            t.start()
+            # 交给常驻注入线程按顺序发送
+            if action in self.hold_actions:
+                self.injector.submit("down", key, stamps)
+                self.held_key = key
+            else:
+                self.injector.submit("press", key, stamps)
 
             # 记录统计数据
             if action in self.stats:
@@ -104,6 +243,15 @@ class GameAdapter:
 
             self.last_action_time = current_time
             self.last_action = action
+            return True
+        return False
+
+    def close(self):
+        # 结束时松开仍按住的键，并等待队列中的按键发完
+        self._release_held()
+        self.injector.close()
+        if self.backend in ("uinput", "evdev"):
+            self.input_lib.close()
 
     # 获取统计结果
     def get_stats(self):
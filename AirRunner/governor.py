@@ -0,0 +1,90 @@
+import time
+from collections import deque
+
+import numpy as np
+
+# 档位：(推理输入缩放, model_complexity, 每N帧推理一次)，从高画质到低开销
+LEVELS = [
+    (1.0, 1, 1),
+    (1.0, 0, 1),  # 默认档，与原先行为一致
+    (0.75, 0, 1),
+    (0.5, 0, 1),
+    (0.5, 0, 2),
+    (0.5, 0, 3),
+]
+DEFAULT_LEVEL = 1
+
+
+# 推理降级调度：按实测推理耗时与预算比较，自动降低分辨率/模型复杂度/隔帧推理
+# 有余量时再逐级恢复；跳过的帧用最近两次检测结果线性外推位置
+class InferenceGovernor:
+    def __init__(self, detector, budget_ms=30, levels=None, start_level=DEFAULT_LEVEL, window=20, hold_time=1.0):
+        self.detector = detector
+        self.budget = budget_ms / 1000
+        self.levels = levels or LEVELS
+        self.window = window
+        self.hold_time = hold_time  # 两次换挡之间的最短间隔，防止来回抖动
+
+        self.level = None
+        self.samples = deque(maxlen=window)
+        self.last_switch = 0
+        self.frame_idx = 0
+        self.history = deque(maxlen=2)  # 最近两次真实检测 (时间, 关键点)
+        self.set_level(start_level)
+
+    @property
+    def scale(self):
+        return self.levels[self.level][0]
+
+    @property
+    def complexity(self):
+        return self.levels[self.level][1]
+
+    @property
+    def skip(self):
+        return self.levels[self.level][2]
+
+    def set_level(self, level):
+        level = min(max(level, 0), len(self.levels) - 1)
+        if level == self.level:
+            return
+        self.level = level
+        self.detector.input_scale = self.scale
+        self.detector.set_model_complexity(self.complexity)
+        self.samples.clear()
+        self.last_switch = time.perf_counter()
+
+    def _report(self, seconds):
+        self.samples.append(seconds)
+        now = time.perf_counter()
+        if len(self.samples) < self.window or now - self.last_switch < self.hold_time:
+            return
+        # 隔帧推理时按每帧平摊开销计算
+        cost = float(np.percentile(self.samples, 75)) / self.skip
+        if cost > self.budget:
+            self.set_level(self.level + 1)
+        elif cost < self.budget * 0.35:
+            self.set_level(self.level - 1)
+
+    def _extrapolate(self, t):
+        (t0, p0), (t1, p1) = self.history
+        if p1 is None:
+            return None
+        if p0 is None or t1 <= t0:
+            return p1
+        return np.clip(p1 + (p1 - p0) * ((t - t1) / (t1 - t0)), 0.0, 1.0)
+
+    def detect(self, frame_rgb, t=None):
+        t = time.perf_counter() if t is None else t
+        self.frame_idx += 1
+
+        # 隔帧档位下，非推理帧直接外推；目标丢失时不跳帧
+        lost = not self.history or self.history[-1][1] is None
+        if self.skip > 1 and not lost and len(self.history) == 2 and self.frame_idx % self.skip:
+            return self._extrapolate(t)
+
+        t0 = time.perf_counter()
+        points = self.detector.detect(frame_rgb)
+        self._report(time.perf_counter() - t0)
+        self.history.append((t, points))
+        return points
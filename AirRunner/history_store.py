@@ -0,0 +1,114 @@
+import csv
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+# (数据库列名, 旧CSV列名, 统计字典键)；left/right是SQL关键字，拼SQL时统一加引号
+COLUMNS = [
+    ("duration", "Duration", "TOTAL_TIME"),
+    ("jump", "Jump", "JUMP"),
+    ("duck", "Duck", "DUCK"),
+    ("left", "Left", "LEFT"),
+    ("right", "Right", "RIGHT"),
+    ("total", "Total_Actions", None),
+]
+ACTION_COLUMNS = ["jump", "duck", "left", "right"]
+
+_COLS_SQL = ", ".join(f'"{c}"' for c, _, _ in COLUMNS)
+_SUMS_SQL = ", ".join(f'SUM("{c}")' for c, _, _ in COLUMNS)
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    {", ".join(f'"{c}" INTEGER NOT NULL DEFAULT 0' for c, _, _ in COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date);
+"""
+
+
+def _row_dict(row):
+    # 与旧CSV的列名保持一致，ReportWindow等调用方无需改动
+    return {"Date": row[0], **{csv_name: row[i + 1] for i, (_, csv_name, _) in enumerate(COLUMNS)}}
+
+
+# 游戏历史：SQLite单文件存储，按自增id追加，date列建索引
+# 取最近N条走主键倒序，只读N行，与历史总条数无关；首次使用时自动导入旧的CSV
+class HistoryStore:
+    def __init__(self, path, migrate_from=None):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+        if migrate_from and os.path.exists(migrate_from):
+            self.migrate_csv(migrate_from)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def add(self, stats, date=None):
+        values = [stats.get(key, 0) for _, _, key in COLUMNS[:-1]]
+        values.append(sum(stats.get(key, 0) for _, _, key in COLUMNS[1:-1]))
+        date = date or datetime.now().strftime(DATE_FORMAT)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f"INSERT INTO sessions (date, {_COLS_SQL}) VALUES (?{', ?' * len(COLUMNS)})",
+                         [date] + values)
+
+    def add_many(self, rows):
+        # rows: [(date, duration, jump, duck, left, right, total), ...]，一个事务批量写入
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(f"INSERT INTO sessions (date, {_COLS_SQL}) VALUES (?{', ?' * len(COLUMNS)})", rows)
+
+    def migrate_csv(self, csv_path):
+        # 导入后把CSV改名为 .bak，避免重复导入
+        with open(csv_path, "r", newline="", encoding="utf-8") as f:
+            rows = [[r["Date"]] + [int(r.get(csv_name) or 0) for _, csv_name, _ in COLUMNS]
+                    for r in csv.DictReader(f)]
+        self.add_many(rows)
+        os.replace(csv_path, csv_path + ".bak")
+        return len(rows)
+
+    def count(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def recent(self, limit=7):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT date, {_COLS_SQL} FROM sessions ORDER BY id DESC LIMIT ?",
+                                (limit,)).fetchall()
+        return [_row_dict(r) for r in reversed(rows)]
+
+    def range(self, start=None, end=None):
+        # 日期区间 [start, end)，参数为 "YYYY-MM-DD[ HH:MM]" 字符串或datetime
+        where, params = self._where(start, end)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT date, {_COLS_SQL} FROM sessions{where} ORDER BY date, id", params).fetchall()
+        return [_row_dict(r) for r in rows]
+
+    def totals(self, start=None, end=None):
+        # 区间内的局数与各列合计(各动作次数、总时长)
+        where, params = self._where(start, end)
+        with closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT COUNT(*), {_SUMS_SQL} FROM sessions{where}", params).fetchone()
+        return {"Sessions": row[0], **{csv_name: row[i + 1] or 0 for i, (_, csv_name, _) in enumerate(COLUMNS)}}
+
+    def weekly(self, start=None, end=None):
+        # 按周汇总，week为 "YYYY-WW"(周一为一周开始)
+        where, params = self._where(start, end)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT strftime('%Y-%W', date) AS week, COUNT(*), {_SUMS_SQL} FROM sessions{where} "
+                                f"GROUP BY week ORDER BY week", params).fetchall()
+        return [{"Week": r[0], "Sessions": r[1], **{csv_name: r[i + 2] for i, (_, csv_name, _) in enumerate(COLUMNS)}}
+                for r in rows]
+
+    @staticmethod
+    def _where(start, end):
+        clauses, params = [], []
+        for op, value in ((">=", start), ("<", end)):
+            if value is None:
+                continue
+            if isinstance(value, datetime):
+                value = value.strftime(DATE_FORMAT)
+            clauses.append(f"date {op} ?")
+            params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
@@ -0,0 +1,88 @@
+import time
+
+import numpy as np
+
+from controllers import ACTIONS
+
+
+# 关键点录制：MediaPipe只需要跑一遍，之后调阈值直接回放坐标
+class LandmarkRecorder:
+    def __init__(self, mode, num_points, fps=30):
+        self.mode = mode
+        self.num_points = num_points
+        self.fps = fps
+        self.shape = (0, 0)
+        self._missing = np.full((num_points, 2), np.nan, dtype=np.float32)
+        self._points = []
+        self._times = []
+
+    def add(self, points, shape=None, t=None):
+        # points为None表示该帧未检测到人，用NaN占位
+        self._points.append(self._missing if points is None else np.asarray(points, dtype=np.float32))
+        self._times.append(time.perf_counter() if t is None else t)
+        if shape is not None:
+            self.shape = tuple(shape[:2])
+
+    def __len__(self):
+        return len(self._points)
+
+    def save(self, path):
+        if not self._points:
+            return False
+        times = np.asarray(self._times, dtype=np.float64)
+        try:
+            np.savez_compressed(
+                path,
+                points=np.stack(self._points),
+                times=(times - times[0]).astype(np.float32),
+                mode=self.mode,
+                fps=self.fps,
+                shape=np.asarray(self.shape, dtype=np.int32),
+            )
+        except Exception as e:
+            print(f"Landmark Save Error: {e}")
+            return False
+        return True
+
+
+def load_landmarks(path):
+    with np.load(path) as data:
+        return {
+            "points": data["points"],
+            "times": data["times"],
+            "mode": str(data["mode"]),
+            "fps": float(data["fps"]),
+            "shape": tuple(int(v) for v in data["shape"]),
+        }
+
+
+def replay_codes(detector, points):
+    # 向量化回放：直接得到每帧的动作编码，不经过MediaPipe
+    return detector.classify_batch(points)
+
+
+def replay_actions(detector, adapter, record, action_filter=None, predictor=None):
+    # 逐帧送入决策逻辑和按键适配器(含冷却/回中规则)，返回实际触发的(帧号, 动作)
+    # action_filter/predictor 与游戏中的决策阶段一致：先平滑/滞回，再预测触发
+    points = record["points"]
+    shape = record["shape"]
+    fps = record["fps"] or 30
+    adapter.last_action_time = float("-inf")  # 时间轴从0开始，开头的动作不受冷却影响
+    fired = []
+    for i in range(len(points)):
+        row = points[i]
+        row = None if np.isnan(row).any() else row
+        if action_filter is not None:
+            action, _ = action_filter.classify(row, shape, i / fps)
+        else:
+            action, _ = detector.classify(row, shape)
+        if predictor is not None:
+            action = predictor.update(row, action, i / fps)
+        if adapter.execute(action, now=i / fps):
+            fired.append([i, action])
+    return fired
+
+
+def code_counts(codes):
+    counts = np.bincount(codes.astype(np.int64), minlength=len(ACTIONS))
+    return {name: int(n) for name, n in zip(ACTIONS, counts)}
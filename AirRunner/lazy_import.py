@@ -0,0 +1,38 @@
+import importlib
+import importlib.util
+import os
+import sys
+
+# 设置该环境变量时关闭延迟导入，用于启动耗时对比 (benchmark.py startup)
+EAGER_ENV = "AIRRUNNER_EAGER_IMPORTS"
+
+
+# 延迟导入：先放一个空壳模块到sys.modules，第一次访问属性时才真正执行导入
+# 之后其它模块里的 import 同名模块拿到的也是这个空壳，不会提前触发加载
+def lazy_import(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if os.environ.get(EAGER_ENV):
+        return importlib.import_module(name)
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def module_available(name):
+    # 只查找不导入，name需为顶层包名
+    return importlib.util.find_spec(name) is not None
+
+
+def preload(*names):
+    # 强制完成延迟模块的加载(启动页后台线程预热用)
+    for name in names:
+        getattr(lazy_import(name), "__name__")
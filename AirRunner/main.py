@@ -1,25 +1,29 @@
 import customtkinter as ctk
-import cv2
+import multiprocessing
+import os
+import queue
 import sys
 import time
 import webbrowser
-import pyautogui
-import numpy as np
 from threading import Thread
 
-try:
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from lazy_import import lazy_import, module_available, preload
 
-    HAS_PLOT = True
-except ImportError:
-    HAS_PLOT = False
+# 重型依赖延迟到第一次使用时才加载，启动器窗口可以更快显示
+# 识别/渲染相关模块本身依赖OpenCV/NumPy/MediaPipe，在开始游戏或校准的函数里再导入
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+pyautogui = lazy_import("pyautogui")
+
+# matplotlib只在结算报告画图时导入
+HAS_PLOT = module_available("matplotlib")
+if not HAS_PLOT:
     print("Warning: matplotlib not found. Charts will be disabled.")
 
-from ui_drawer import CyberHUD
-from controllers import HandController, BodyController
+from camera_probe import CameraProber, configure_capture
 from game_adapter import GameAdapter
-from utils import ConfigManager, AudioManager, HistoryManager
+from session import GameSession
+from utils import ConfigManager, AudioManager, HistoryManager, SharedSettings
 
 # 风格配置
 #=========================================
@@ -75,14 +79,17 @@ def draw_centered_text(img, text, y, font_scale, color, thickness=2, outline=Tru
     cv2.putText(img, text, (x, y), font, font_scale, color, thickness)
 
 
-def run_calibration_wizard(camera_index=0):
-    if sys.platform.startswith("win"):
-        cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
-    else:
-        cap = cv2.VideoCapture(camera_index)
+def run_calibration_wizard(camera_index=0, source=None):
+    from capture import open_source
+    from detector_registry import DetectorRegistry
+    from ui_drawer import blend_color
+
+    # source可传入视频文件或图片目录，代替摄像头
+    cap = open_source(camera_index if source is None else source, paced=True)
     if not cap.isOpened(): return None
 
-    detector = BodyController()
+    # 校准只用到鼻尖位置，默认阈值即可；复用启动页预热好的模型
+    detector = DetectorRegistry.get("BODY")
     win_name = "Smart Calibration"
     cv2.namedWindow(win_name, cv2.WINDOW_NORMAL)
     cv2.resizeWindow(win_name, 640, 480)
@@ -116,9 +123,7 @@ def run_calibration_wizard(camera_index=0):
         else:
             timer_start = time.time() - elapsed
 
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, 0), (w, 120), CV_COLOR_WHITE, -1)
-        cv2.addWeighted(overlay, 0.9, frame, 0.1, 0, frame)
+        blend_color(frame[:120], CV_COLOR_WHITE, 0.9)
         cv2.line(frame, (0, 120), (w, 120), CV_COLOR_BLUE, 4)
         draw_centered_text(frame, step_info["title"], 50, 1.2, CV_COLOR_BLUE, 3, outline=False)
         draw_centered_text(frame, step_info["desc"], 95, 0.7, CV_COLOR_DARK, 2, outline=False)
@@ -153,9 +158,7 @@ def run_calibration_wizard(camera_index=0):
                     elapsed = 0;
                     last_beep = 0
         else:
-            warn_overlay = frame.copy()
-            cv2.rectangle(warn_overlay, (0, 0), (w, h), (0, 0, 255), -1)
-            cv2.addWeighted(warn_overlay, 0.2, frame, 0.8, 0, frame)
+            blend_color(frame, (0, 0, 255), 0.2)
             draw_centered_text(frame, "USER NOT DETECTED", h // 2 - 20, 1.2, CV_COLOR_RED, 3)
             draw_centered_text(frame, "Please show your face", h // 2 + 30, 0.8, CV_COLOR_WHITE, 2)
 
@@ -186,99 +189,245 @@ def run_calibration_wizard(camera_index=0):
 
 # 游戏主循环
 # =========================================
-def run_game_loop(mode_type, settings, game_url):
+def run_game_loop(mode_type, settings, game_url, source=None, cap=None, stop_event=None, progress=None,
+                  live_settings=None, display=None):
+    # cap: 由GameSession传入已打开的摄像头，结束时不释放；stop_event: 外部请求结束
+    # progress: 每0.5秒回调一次实时状态(FPS/动作计数/延迟)
+    # live_settings: SharedSettings，游戏中修改的阈值/滞回/冷却在下一帧生效，无需重开
+    # display: FrameDisplay，由Tk主线程显示HUD；不传时在本线程直接显示(单独运行/调试)
+    from capture import FrameGrabber, open_source, frame_brightness, is_camera_source
+    from detector_registry import DetectorRegistry
+    from filters import make_action_filter, make_action_predictor
+    from governor import InferenceGovernor
+    from landmark_cache import LandmarkRecorder
+    from metrics import LatencyTracker, stamp
+    from pipeline import FramePipeline, BufferPool, FrameDisplay
+    from ui_drawer import CyberHUD
+
     if game_url: webbrowser.open(game_url)
-    cam_index = settings.get("camera_index", 0)
-    cap = cv2.VideoCapture(cam_index, cv2.CAP_DSHOW if sys.platform.startswith("win") else 0)
+    owns_cap = cap is None
+    if owns_cap:
+        # source可传入视频文件或图片目录，代替摄像头
+        if source is None:
+            source = settings.get("camera_index", 0)
+        cap = open_source(source, paced=True)
+        # 摄像头按探测缓存选延迟最低的格式/分辨率/帧率(由GameSession打开的已在打开时设置)
+        if is_camera_source(source):
+            configure_capture(cap, int(source))
     if not cap.isOpened(): return "ERROR_CAM"
 
-    cap.set(3, 640);
-    cap.set(4, 480)
-    window_name = "AirRunner HUD"
-    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-    cv2.resizeWindow(window_name, 640, 480)
-    try:
-        cv2.setWindowProperty(window_name, cv2.WND_PROP_TOPMOST, 1)
-    except:
-        pass
+    local_display = display is None
+    if local_display:
+        display = FrameDisplay()
+    display.reset()
 
     hud = CyberHUD()
-    adapter = GameAdapter()
-    detector = HandController(settings=settings) if mode_type == "HAND" else BodyController(settings=settings)
-
-    start_time = time.time()
+    tracker = LatencyTracker()
+    show_latency = settings.get("show_latency_panel", False)
+    adapter = GameAdapter(tracker=tracker, backend=settings.get("input_backend") or None,
+                          device=settings.get("uinput_device"))
+    # 推理后端为"process"时推理放到独立进程，避开GIL，与HUD绘制/Tk互不拖慢
+    # 识别器由注册表保管，多局之间复用已加载的模型
+    detector = DetectorRegistry.get(mode_type, settings, settings.get("inference_backend", "thread"))
+
+    # 平滑 + 滞回过滤了阈值附近的抖动，冷却时间可以缩短
+    action_filter = make_action_filter(detector, settings)
+    if action_filter is not None:
+        adapter.cooldown = settings.get("filter_cooldown", adapter.cooldown)
+    # 可选的预测触发：按关键点速度提前发出按键
+    predictor = make_action_predictor(detector, settings)
+
+    # 按延迟预算自动降级/恢复推理档位
+    governor = None
+    if settings.get("governor_enabled", True):
+        governor = InferenceGovernor(detector, settings.get("latency_budget_ms", 30))
+
+    # 录制每帧关键点，供离线调参回放 (benchmark.py landmarks)
+    record_path = settings.get("record_landmarks", "")
+    recorder = LandmarkRecorder(mode_type, len(detector.LANDMARK_IDS)) if record_path else None
+
+    # 可选的逐帧遥测，决策线程只写预分配数组，后台线程分块落盘 (benchmark.py telemetry)
+    telemetry = None
+    if settings.get("telemetry_enabled", False):
+        from telemetry import TelemetryLog, telemetry_format
+        name = f"{mode_type}_{time.strftime('%Y%m%d_%H%M%S')}.{telemetry_format()}"
+        try:
+            telemetry = TelemetryLog(os.path.join(settings.get("telemetry_dir", "telemetry"), name))
+        except Exception as e:
+            print(f"Telemetry Error: {e}")
 
-    last_user_seen = time.time()
-    is_auto_paused = False
+    # 采集 / 预处理 / 推理 / 决策 各占一个线程，本线程画HUD，窗口由display显示
+    grabber = FrameGrabber(cap)
 
+    start_time = time.time()
     countdown_dur = 4
-    last_cd_int = 5
-    focus_acquired = False
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret: break
-        frame = cv2.flip(frame, 1)
-
-        if np.mean(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)) < 40:
-            frame = hud.draw_warning(frame, "Too Dark! Check Light")
-            cv2.imshow(window_name, frame)
-            if cv2.waitKey(5) & 0xFF == 27: break
-            continue
-
-        elapsed = time.time() - start_time
-        remaining = countdown_dur - elapsed
-        thresholds = detector.get_thresholds()
+    # 决策线程内部状态
+    state = {
+        "last_user_seen": time.time(),
+        "is_auto_paused": False,
+        "last_cd_int": 5,
+        "focus_acquired": False,
+        "settings_version": None,
+    }
+
+    def apply_live_settings():
+        # 只热更新每帧判定用到的参数；ROI/推理后端等需要重开一局
+        version, latest = live_settings.snapshot()
+        detector.update_thresholds(latest)
+        if action_filter is not None:
+            action_filter.band = latest.get("hysteresis_band", action_filter.band)
+            adapter.cooldown = latest.get("filter_cooldown", adapter.cooldown)
+        state["settings_version"] = version
+        state["thresholds"] = detector.get_thresholds()
+
+    # 镜像/RGB转换写入复用的缓冲，亮度只做采样估计
+    pool = BufferPool()
+
+    def preprocess_stage(packet):
+        raw = packet.frame
+        packet.frame, packet.rgb = detector.preprocess(raw, out=pool.acquire(raw.shape),
+                                                       out_rgb=pool.acquire(raw.shape))
+        packet.dark = frame_brightness(packet.frame) < 40
+        return packet
+
+    def inference_stage(packet):
+        if not packet.dark:
+            packet.points = governor.detect(packet.rgb, packet.capture_time) if governor else detector.detect(packet.rgb)
+        packet.release_rgb()
+        return packet
+
+    def action_stage(packet):
+        if live_settings is not None and live_settings.version != state["settings_version"]:
+            apply_live_settings()
+        if packet.dark:
+            # 画面过暗时按无人处理：松开按住的键(如下蹲)，恢复后重新触发
+            adapter.execute("NEUTRAL")
+            packet.view = "DARK"
+            return packet
+
+        if action_filter is not None:
+            raw_action, packet.data = action_filter.classify(packet.points, packet.frame.shape, packet.capture_time)
+        else:
+            raw_action, packet.data = detector.classify(packet.points, packet.frame.shape)
+        if predictor is not None:
+            raw_action = predictor.update(packet.points, raw_action, packet.capture_time)
+        if telemetry is not None:
+            # 记录未经滤波/预测的阈值判定，与最终动作对照
+            filtered = action_filter is not None or predictor is not None
+            packet.raw_action = detector.classify(packet.points, packet.frame.shape)[0] if filtered else raw_action
+        if recorder is not None:
+            recorder.add(packet.points, packet.frame.shape, packet.capture_time)
+        stamp(packet.stamps, "decision")
+        # 阈值只在版本变化时重新取，HUD静态图层也按版本号缓存
+        packet.thresholds = state["thresholds"] if live_settings is not None else detector.get_thresholds()
+        packet.settings_version = state["settings_version"]
+        remaining = countdown_dur - (time.time() - start_time)
 
         if remaining > 0:
             # 倒计时逻辑
-            if int(remaining) != last_cd_int:
+            if int(remaining) != state["last_cd_int"]:
                 AudioManager.play("countdown")
-                last_cd_int = int(remaining)
-            if remaining < 1.5 and not focus_acquired:
+                state["last_cd_int"] = int(remaining)
+            if remaining < 1.5 and not state["focus_acquired"]:
                 try:
                     w, h = pyautogui.size()
                     pyautogui.click(w // 2, h // 2)
                 except:
                     pass
-                focus_acquired = True
-
-            _, data = detector.process(frame)
-            frame = hud.draw_interface(frame, "READY", data, thresholds, countdown=remaining)
-            last_user_seen = time.time()
+                state["focus_acquired"] = True
+
+            packet.view = "COUNTDOWN"
+            packet.action = "READY"
+            packet.countdown = remaining
+            state["last_user_seen"] = time.time()
+            return packet
+
+        # 游戏逻辑
+        if state["last_cd_int"] != -1:
+            AudioManager.play("start")
+            state["last_cd_int"] = -1
+
+        # 自动暂停逻辑
+        if packet.data is not None:
+            state["last_user_seen"] = time.time()
+            state["is_auto_paused"] = False  # 用户回来了
+        elif time.time() - state["last_user_seen"] > 2.0:
+            state["is_auto_paused"] = True  # 2秒没检测到人，自动暂停
+
+        if state["is_auto_paused"]:
+            if time.time() - state["last_user_seen"] < 2.2:  # 触发一次ESC
+                packet.fired = adapter.execute("PAUSE", packet.stamps)
+            packet.view = "PAUSED"
+            packet.action = "PAUSE"
         else:
-            # 游戏逻辑
-            if last_cd_int != -1:
-                AudioManager.play("start")
-                last_cd_int = -1
-
-            raw_action, data = detector.process(frame)
-
-            # 自动暂停逻辑
-            if data is not None:
-                last_user_seen = time.time()
-                if is_auto_paused:
-                    is_auto_paused = False  # 用户回来了
-            else:
-                if time.time() - last_user_seen > 2.0:
-                    is_auto_paused = True  # 2秒没检测到人，自动暂停
-
-            if is_auto_paused:
-                if time.time() - last_user_seen < 2.2:  # 触发一次ESC
-                    adapter.execute("PAUSE")
-                frame = hud.draw_auto_pause(frame)
-                action = "PAUSE"
+            packet.action = raw_action
+            packet.fired = adapter.execute(raw_action, packet.stamps)
+        return packet
+
+    def logged_action_stage(packet):
+        packet = action_stage(packet)
+        telemetry.add(packet.capture_time, packet.points, detector.CENTER_INDEX, packet.raw_action, packet.action,
+                      packet.fired, packet.stamps)
+        return packet
+
+    pipeline = FramePipeline(grabber, [
+        ("preprocess", preprocess_stage),
+        ("inference", inference_stage),
+        ("action", action_stage if telemetry is None else logged_action_stage),
+    ], pool=pool).start()
+
+    last_progress = 0
+    while pipeline.running and not display.closed.is_set() and not (stop_event is not None and stop_event.is_set()):
+        if progress is not None and time.time() - last_progress > 0.5:
+            last_progress = time.time()
+            progress({
+                "mode": mode_type,
+                "elapsed": time.time() - start_time,
+                "fps": hud.fps,
+                "actions": {k: v for k, v in adapter.stats.items() if k != "TOTAL_TIME"},
+                "latency": tracker.summary(max_age=0.5),
+            })
+
+        packet = pipeline.get()
+        if packet is not None:
+            # HUD直接画在帧缓冲上(原地修改)，显示端显示完再归还缓冲
+            frame = packet.frame
+            if packet.view == "DARK":
+                hud.draw_warning(frame, "Too Dark! Check Light")
+            elif packet.view == "PAUSED":
+                hud.draw_auto_pause(frame)
             else:
-                action = raw_action
-                adapter.execute(action)
-                frame = hud.draw_interface(frame, action, data, thresholds, countdown=0)
-
-        cv2.imshow(window_name, frame)
-        if cv2.getWindowProperty(window_name, cv2.WND_PROP_VISIBLE) < 1: break
-        if cv2.waitKey(5) & 0xFF == 27: break
-
-    cap.release();
-    cv2.destroyAllWindows()
+                hud.draw_interface(frame, packet.action, packet.data, packet.thresholds,
+                                   countdown=packet.countdown, version=packet.settings_version)
+            if show_latency:
+                hud.draw_latency_panel(frame, tracker.summary(max_age=0.5))
+
+            stamp(packet.stamps, "render")
+            tracker.record_frame(packet.stamps)
+            display.show(packet)
+
+        if local_display:
+            display.pump()
+        key = display.poll_key()
+        while key is not None:
+            if key in (ord("l"), ord("L")):
+                show_latency = not show_latency
+            key = display.poll_key()
+
+    pipeline.stop()
+    adapter.close()
+    if owns_cap:
+        grabber.release()
+    else:
+        grabber.stop()
+    if local_display:
+        display.close()
+    if settings.get("latency_export", False):
+        tracker.export()
+    if recorder is not None:
+        recorder.save(record_path)
+    if telemetry is not None:
+        telemetry.close()
     return adapter.get_stats()
 
 
@@ -294,6 +443,15 @@ class ReportWindow(ctk.CTkToplevel):
 
         # 保存数据
         HistoryManager.save_session(stats)
+        # 全部历史读成列数组做统计，按文件mtime缓存，之后只读新增的记录
+        import analytics
+        try:
+            HistoryManager.store()
+            summary = analytics.summarize(analytics.load_history(HistoryManager.path))
+        except Exception as e:
+            # 数据库损坏或被占用时只显示本局结果
+            print(f"History Load Error: {e}")
+            summary = None
 
         # 创建滚动容器
         scroll = ctk.CTkScrollableFrame(self, fg_color="transparent")
@@ -325,38 +483,62 @@ class ReportWindow(ctk.CTkToplevel):
         grid.grid_columnconfigure(0, weight=1)
         grid.grid_columnconfigure(1, weight=1)
 
-        # 估算热量
-        total_jumps = stats.get("JUMP", 0)
-        total_ducks = stats.get("DUCK", 0)
-        # 假设每次跳跃消耗0.5千卡，下蹲消耗0.3千卡，侧身消耗0.1千卡
-        calories = (total_jumps * 0.5) + (total_ducks * 0.3) + ((stats.get("LEFT", 0) + stats.get("RIGHT", 0)) * 0.1)
+        # 估算热量：每次跳跃0.5千卡，下蹲0.3千卡，侧身0.1千卡 (analytics.CALORIES_PER_ACTION)
+        calories = analytics.session_calories(stats)
 
         # 在界面上展示
         ctk.CTkLabel(card, text=f"🔥 消耗热量: {round(calories, 2)} kcal", font=("Arial", 16, "bold"),
                      text_color="#FF5252").pack(pady=(0, 10))
+        if summary:
+            # 各动作近20局的变化趋势
+            trends = "  ".join(f"{label}{'↑' if slope > 0.1 else '↓' if slope < -0.1 else '→'}"
+                               for label, slope in zip(("跳跃", "下蹲", "左移", "右移"), summary["trends"].values()))
+            ctk.CTkLabel(card, text=f"连续运动 {summary['streak']} 天 (最长 {summary['longest_streak']} 天)  |  "
+                                    f"每分钟动作 {summary['apm_last']:.0f} (近期平均 {summary['apm_avg']:.0f})\n"
+                                    f"累计 {summary['sessions']} 局 · {summary['total_minutes']:.0f} 分钟 · "
+                                    f"{summary['total_calories']:.0f} kcal\n趋势: {trends}",
+                         font=FONT_BODY, text_color=THEME["text_light"]).pack(pady=(0, 20))
 
         # 历史趋势图表
-        if HAS_PLOT:
+        if HAS_PLOT and summary:
             chart_frame = ctk.CTkFrame(scroll, fg_color=THEME["card_bg"], corner_radius=20)
             chart_frame.pack(fill="x", padx=10, pady=10)
-            ctk.CTkLabel(chart_frame, text="📈 近期活跃度 (动作总数)", font=FONT_H2, text_color=THEME["text_dark"]).pack(
-                pady=10)
-            self._draw_chart(chart_frame)
+            ctk.CTkLabel(chart_frame, text="📈 近期活跃度 (动作总数 / 滑动平均)", font=FONT_H2,
+                         text_color=THEME["text_dark"]).pack(pady=10)
+            self._draw_chart(chart_frame, summary)
+
+        # 开启遥测时另画按键反应时间分布
+        recordings = analytics.load_telemetry_dir(self.master.global_settings.get("telemetry_dir", "telemetry"))
+        if HAS_PLOT and recordings:
+            counts, edges, times = analytics.reaction_histogram(recordings)
+            if times.size:
+                chart_frame = ctk.CTkFrame(scroll, fg_color=THEME["card_bg"], corner_radius=20)
+                chart_frame.pack(fill="x", padx=10, pady=10)
+                ctk.CTkLabel(chart_frame, text=f"⏱ 按键反应时间 (中位数 {np.median(times):.0f} ms)", font=FONT_H2,
+                             text_color=THEME["text_dark"]).pack(pady=10)
+                self._draw_histogram(chart_frame, counts, edges)
 
         ctk.CTkButton(self, text="关闭", font=FONT_H2, fg_color=THEME["btn_green"], height=50, corner_radius=20,
                       command=self.destroy).pack(side="bottom", pady=20)
 
-    def _draw_chart(self, parent):
-        # 获取数据
-        history = HistoryManager.load_recent(7)
-        if not history:
-            ctk.CTkLabel(parent, text="暂无历史数据", text_color=THEME["text_light"]).pack(pady=20)
-            return
+    def _draw_chart(self, parent, summary):
+        scores = summary["recent_totals"]
+        dates = [f"G{i + 1}" for i in range(len(scores))]
+
+        fig, ax, text_color = self._new_figure()
+        ax.bar(dates, scores, color='#5BC236', width=0.5)
+        ax.plot(dates, summary["recent_rolling"], color='#FFC107', linewidth=2, marker='o')
+        self._show_figure(parent, fig, ax, text_color)
 
-        dates = [f"G{i + 1}" for i in range(len(history))]
-        scores = [int(h["Total_Actions"]) for h in history]
+    def _draw_histogram(self, parent, counts, edges):
+        fig, ax, text_color = self._new_figure()
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color='#4EC0F9', edgecolor='white')
+        ax.set_xlabel('ms', color=text_color)
+        self._show_figure(parent, fig, ax, text_color)
 
+    def _new_figure(self):
         # Matplotlib绘图
+        from matplotlib.figure import Figure
         fig = Figure(figsize=(5, 3), dpi=100)
 
         # 适配深色/浅色模式
@@ -369,9 +551,10 @@ class ReportWindow(ctk.CTkToplevel):
         fig.patch.set_facecolor(bg_color)
         ax = fig.add_subplot(111)
         ax.set_facecolor(bg_color)
+        return fig, ax, text_color
 
-        bars = ax.bar(dates, scores, color='#5BC236', width=0.5)
-
+    def _show_figure(self, parent, fig, ax, text_color):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         ax.spines['left'].set_color(text_color)
@@ -407,19 +590,51 @@ class SplashScreen(ctk.CTkFrame):
         self.after(500, self.check_system)
 
     def check_system(self):
-        self.progress.set(0.3)
+        self.progress.set(0.1)
+        # 摄像头枚举与能力探测和模块加载同时在后台进行，有缓存时几乎不耗时
+        self.controller.camera_prober.start()
+        self._warm_status = {"progress": 0.1, "text": "正在加载视觉模块...", "camera": False, "error": False,
+                             "done": False}
+        Thread(target=self._warm_up, daemon=True).start()
+        self.after(100, self._poll_warm_up)
+
+    def _warm_up(self):
+        # 后台线程：加载OpenCV/MediaPipe、检查摄像头并预热模型，Tk线程只轮询进度
+        status = self._warm_status
         try:
+            preload("numpy", "cv2")
+            status.update(progress=0.3, text="正在检测摄像头...")
+            prober = self.controller.camera_prober
+            prober.wait()
             cam_idx = self.controller.global_settings.get("camera_index", 0)
-            cap = cv2.VideoCapture(cam_idx, cv2.CAP_DSHOW if sys.platform.startswith("win") else 0)
-            if cap.isOpened():
-                self.progress.set(1.0)
-                self.status_lbl.configure(text="系统就绪!")
-                cap.release()
-                self.after(800, lambda: self.controller.show_frame("PageHome"))
-            else:
-                self.status_lbl.configure(text="❌ 未检测到摄像头", text_color=THEME["btn_red"])
-        except:
+            status["camera"] = prober.find(cam_idx) is not None
+            if status["camera"]:
+                status.update(progress=0.6, text="正在加载识别模型...")
+                try:
+                    from detector_registry import DetectorRegistry
+                    settings = self.controller.global_settings
+                    DetectorRegistry.warm_up(settings=settings, backend=settings.get("inference_backend", "thread"))
+                except Exception as e:
+                    print(f"Model Warm-up Error: {e}")
+        except Exception as e:
+            print(f"System Check Error: {e}")
+            status["error"] = True
+        status["done"] = True
+
+    def _poll_warm_up(self):
+        status = self._warm_status
+        if not status["done"]:
+            self.progress.set(status["progress"])
+            self.status_lbl.configure(text=status["text"])
+            self.after(100, self._poll_warm_up)
+        elif status["error"]:
             self.status_lbl.configure(text="❌ 系统错误", text_color=THEME["btn_red"])
+        elif status["camera"]:
+            self.progress.set(1.0)
+            self.status_lbl.configure(text="系统就绪!")
+            self.after(800, lambda: self.controller.show_frame("PageHome"))
+        else:
+            self.status_lbl.configure(text="❌ 未检测到摄像头", text_color=THEME["btn_red"])
 
 
 # PageHome
@@ -453,6 +668,16 @@ class PageHome(ctk.CTkFrame):
         self._create_card(grid, 1, "😊 面部模式", "面部识别控制\n跳跃下蹲", THEME["card_header_green"],
                           lambda: self.start_game("BODY"))
 
+        # 游戏进行中的实时状态，由后台会话通过队列发回
+        self.session_bar = ctk.CTkFrame(self, fg_color=THEME["card_bg"], corner_radius=15, height=60)
+        self.session_lbl = ctk.CTkLabel(self.session_bar, text="", font=FONT_BODY, text_color=THEME["text_dark"])
+        self.session_lbl.pack(side="left", padx=20, pady=15)
+        ctk.CTkButton(self.session_bar, text="停止", font=FONT_BODY, fg_color=THEME["btn_red"], width=90,
+                      corner_radius=15, command=self.stop_game).pack(side="right", padx=10)
+        ctk.CTkButton(self.session_bar, text="重新开始", font=FONT_BODY, fg_color=THEME["btn_green"],
+                      hover_color=THEME["btn_hover"], width=90, corner_radius=15,
+                      command=self.restart_game).pack(side="right", padx=10)
+
     def _create_card(self, parent, col, title, desc, bg_color, cmd):
         card = ctk.CTkFrame(parent, fg_color=THEME["card_bg"], corner_radius=20)
         card.grid(row=0, column=col, padx=15, sticky="nsew")
@@ -466,20 +691,70 @@ class PageHome(ctk.CTkFrame):
             side="bottom", pady=40)
 
     def start_game(self, mode):
-        settings = self.controller.global_settings
+        session = self.controller.session
+        if session.running:
+            return
+        # 传副本给后台线程，游戏中修改设置不会和决策线程互相影响
+        settings = dict(self.controller.global_settings)
         game_url = GAME_URLS[self.combo_game.get()]
-        self.controller.withdraw()
-        try:
-            stats = run_game_loop(mode, settings, game_url)
-            if stats == "ERROR_CAM":
-                ctk.CTkInputDialog(text="无法打开摄像头！\n请检查连接。", title="错误")
-        except Exception as e:
-            print(f"Loop Error: {e}")
-            stats = None
-        finally:
-            self.controller.deiconify()
-            if stats and stats != "ERROR_CAM":
-                ReportWindow(self.controller, stats)
+        session.start(mode, settings, game_url)
+        self.controller.iconify()
+        self.session_lbl.configure(text="游戏启动中...")
+        self.session_bar.pack(fill="x", pady=10)
+        self.after(100, self._poll_session)
+        self._pump_display()
+
+    def stop_game(self):
+        self.controller.session.stop()
+
+    def restart_game(self):
+        self.session_lbl.configure(text="正在重新开始...")
+        self.controller.session.restart()
+
+    def _poll_session(self):
+        session = self.controller.session
+        while True:
+            try:
+                kind, data = session.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self._show_progress(data)
+            elif kind == "restarted":
+                # 重开的这一局不弹结算页，但照常记入历史
+                if isinstance(data, dict):
+                    HistoryManager.save_session(data)
+                self.session_lbl.configure(text="已重新开始")
+            else:
+                self._on_session_end(kind, data)
+                return
+        self.after(100, self._poll_session)
+
+    def _pump_display(self):
+        # HUD窗口的imshow/waitKey都在Tk线程执行，会话运行期间高频轮询
+        session = self.controller.session
+        session.display.pump()
+        if session.running:
+            self.after(session.display.interval_ms, self._pump_display)
+
+    def _show_progress(self, data):
+        total = sum(data["actions"].values())
+        text = f"{'手势' if data['mode'] == 'HAND' else '面部'}模式  {int(data['elapsed'])}s  FPS {int(data['fps'])}  动作 {total}"
+        frame_total = data["latency"].get("frame_total")
+        if frame_total:
+            text += f"  延迟p95 {frame_total['p95']:.0f}ms"
+        self.session_lbl.configure(text=text)
+
+    def _on_session_end(self, kind, stats):
+        self.controller.session.close_display()
+        self.session_bar.pack_forget()
+        self.controller.deiconify()
+        if kind == "error":
+            return
+        if stats == "ERROR_CAM":
+            ctk.CTkInputDialog(text="无法打开摄像头！\n请检查连接。", title="错误")
+        elif stats:
+            ReportWindow(self.controller, stats)
 
 
 # PageSettings
@@ -506,14 +781,20 @@ class PageSettings(ctk.CTkFrame):
                                                                                                          padx=20,
                                                                                                          pady=(15, 5))
 
+        cam_row = ctk.CTkFrame(cam_frame, fg_color="transparent")
+        cam_row.pack(fill="x", padx=20, pady=10)
+        # 设备列表来自后台探测结果，不再写死编号
+        self._camera_labels = {}
         self.camera_combo = ctk.CTkComboBox(
-            cam_frame,
-            values=["Camera 0 (默认)", "Camera 1 (外接)", "Camera 2"],
-            width=250, font=FONT_BODY, dropdown_font=FONT_BODY,
+            cam_row,
+            values=[],
+            width=360, font=FONT_BODY, dropdown_font=FONT_BODY,
             command=self.on_camera_change
         )
-        self.camera_combo.set("Camera 0 (默认)")
-        self.camera_combo.pack(padx=20, pady=10, anchor="w")
+        self.camera_combo.set("正在检测摄像头...")
+        self.camera_combo.pack(side="left")
+        ctk.CTkButton(cam_row, text="重新检测", font=FONT_BODY, width=100,
+                      command=self.rescan_cameras).pack(side="left", padx=10)
 
         calib_frame = ctk.CTkFrame(panel, fg_color=THEME["card_header_blue"], corner_radius=15)
         calib_frame.pack(fill="x", padx=40, pady=10)
@@ -567,11 +848,29 @@ class PageSettings(ctk.CTkFrame):
             self.sliders[key] = slider
 
     def on_camera_change(self, choice):
-        try:
-            idx = int(choice.split(" ")[1])
-        except:
-            idx = 0
-        self.controller.update_settings({"camera_index": idx})
+        idx = self._camera_labels.get(choice)
+        if idx is not None:
+            self.controller.update_settings({"camera_index": idx})
+
+    def rescan_cameras(self):
+        # 忽略缓存重新探测(更换了摄像头或驱动后使用)
+        self.controller.camera_prober.start(refresh=True)
+        self.camera_combo.set("正在检测摄像头...")
+        self.after(200, self._fill_cameras)
+
+    def _fill_cameras(self):
+        prober = self.controller.camera_prober
+        if not prober.done:
+            self.after(200, self._fill_cameras)
+            return
+        self._camera_labels = {}
+        for device in prober.devices or []:
+            label = f"Camera {device['index']} - {device['name']}"
+            self._camera_labels[label] = device["index"]
+        self.camera_combo.configure(values=list(self._camera_labels) or ["未检测到摄像头"])
+        curr_cam = self.controller.global_settings.get("camera_index", 0)
+        current = next((l for l, i in self._camera_labels.items() if i == curr_cam), None)
+        self.camera_combo.set(current or f"Camera {curr_cam} (未连接)")
 
     def on_slider_change(self, key, value, label_widget):
         label_widget.configure(text=f"{round(value, 2)}")
@@ -588,10 +887,15 @@ class PageSettings(ctk.CTkFrame):
         for key, slider in self.sliders.items():
             if key in g_set:
                 slider.set(g_set[key])
-        curr_cam = g_set.get("camera_index", 0)
-        self.camera_combo.set(f"Camera {curr_cam} (当前)")
+        self._fill_cameras()
 
     def start_calibration_wizard(self):
+        if self.controller.session.running:
+            return
+        # 会话空闲时仍占着摄像头，部分平台不能重复打开，先释放
+        # 向导和HUD窗口一样在Tk线程使用HighGUI
+        self.controller.session.release_camera()
+        self.controller.session.close_display()
         self.controller.withdraw()
         cam_idx = self.controller.global_settings.get("camera_index", 0)
         new_settings = run_calibration_wizard(cam_idx)
@@ -684,6 +988,13 @@ class App(ctk.CTk):
         self.configure(fg_color=THEME["bg_sky"])
 
         self.global_settings = USER_CONFIG.copy()
+        # 游戏会话在后台线程运行，摄像头跨局复用
+        # 带版本号的共享设置，运行中的游戏据此热更新；同时轮询配置文件的外部修改
+        self.live_settings = SharedSettings(self.global_settings, ConfigManager.path)
+        self.camera_prober = CameraProber()
+        self.session = GameSession(run_game_loop, prober=self.camera_prober, live_settings=self.live_settings)
+        # 启动时预加载音效；关闭音效时整个音效引擎不初始化
+        AudioManager.init(self.global_settings.get("sound_enabled", True))
 
         self.grid_columnconfigure(0, weight=0)
         self.grid_columnconfigure(1, weight=1)
@@ -707,6 +1018,17 @@ class App(ctk.CTk):
             frame.grid(row=0, column=0, sticky="nsew")
 
         self.show_frame("SplashScreen")
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(500, self._poll_settings)
+
+    def on_close(self):
+        self.session.close()
+        ConfigManager.flush()
+        # 释放注册表里常驻的模型和推理进程(未加载过则不必导入)
+        registry = sys.modules.get("detector_registry")
+        if registry is not None:
+            registry.DetectorRegistry.close_all()
+        self.destroy()
 
     def _center_window(self, w, h):
         screen_width = self.winfo_screenwidth()
@@ -756,11 +1078,23 @@ class App(ctk.CTk):
         else:
             self.sidebar.grid()
 
+    def _poll_settings(self):
+        # user_config.json 在外部被修改时同步到界面，运行中的游戏通过版本号感知
+        if self.live_settings.poll():
+            self.global_settings.update(self.live_settings.snapshot()[1])
+            self.frames["PageSettings"].refresh()
+        self.after(500, self._poll_settings)
+
     def update_settings(self, new_settings):
         self.global_settings.update(new_settings)
-        ConfigManager.save(self.global_settings)
+        self.live_settings.update(new_settings)
+        # 拖动滑块时每次都会调用，只记录到内存，由后台线程合并写盘
+        ConfigManager.save_async(self.global_settings)
+        if "sound_enabled" in new_settings:
+            AudioManager.set_enabled(new_settings["sound_enabled"])
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包exe时进程推理后端需要
     app = App()
     app.mainloop()
\ No newline at end of file
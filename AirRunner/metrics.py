@@ -0,0 +1,104 @@
+import csv
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+LATENCY_REPORT_FILE = "latency_report"  # 导出时自动加 .json / .csv 后缀
+
+# (统计项, 起点时间戳, 终点时间戳)
+FRAME_SPANS = [
+    ("preprocess", "capture", "preprocess"),
+    ("inference", "preprocess", "inference"),
+    ("decision", "inference", "decision"),
+    ("render", "action", "render"),
+    ("frame_total", "capture", "render"),
+]
+DISPATCH_SPANS = [
+    ("dispatch", "decision", "dispatch"),
+    ("key_total", "capture", "dispatch"),  # 画面采集 -> 按键发出
+]
+STAGE_ORDER = [name for name, _, _ in FRAME_SPANS + DISPATCH_SPANS]
+
+
+def stamp(stamps, name):
+    # 统一使用perf_counter打点
+    if stamps is not None:
+        stamps[name] = time.perf_counter()
+
+
+# 分阶段延迟统计：滚动窗口给HUD用，整局数据用于结束后导出
+class LatencyTracker:
+    def __init__(self, window=300):
+        self.window = window
+        self._lock = threading.Lock()
+        self._rolling = {}
+        self._session = {}
+        self._summary_cache = None
+        self._summary_time = 0
+
+    def record(self, stage, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            if stage not in self._rolling:
+                self._rolling[stage] = deque(maxlen=self.window)
+                self._session[stage] = []
+            self._rolling[stage].append(ms)
+            self._session[stage].append(ms)
+
+    def _record_spans(self, stamps, spans):
+        for name, begin, end in spans:
+            if begin in stamps and end in stamps:
+                self.record(name, stamps[end] - stamps[begin])
+
+    def record_frame(self, stamps):
+        self._record_spans(stamps, FRAME_SPANS)
+
+    def record_dispatch(self, stamps):
+        self._record_spans(stamps, DISPATCH_SPANS)
+
+    @staticmethod
+    def _describe(values):
+        arr = np.asarray(values, dtype=np.float64)
+        p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+        return {
+            "count": int(arr.size),
+            "mean": round(float(arr.mean()), 3),
+            "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3),
+        }
+
+    def summary(self, rolling=True, max_age=0):
+        # max_age>0时复用缓存，避免HUD每帧都重算分位数
+        now = time.perf_counter()
+        if rolling and max_age and self._summary_cache is not None and now - self._summary_time < max_age:
+            return self._summary_cache
+
+        with self._lock:
+            source = self._rolling if rolling else self._session
+            snapshot = {k: list(v) for k, v in source.items() if v}
+
+        names = [n for n in STAGE_ORDER if n in snapshot] + [n for n in snapshot if n not in STAGE_ORDER]
+        result = {name: self._describe(snapshot[name]) for name in names}
+        if rolling:
+            self._summary_cache = result
+            self._summary_time = now
+        return result
+
+    def export(self, path_prefix=LATENCY_REPORT_FILE):
+        # 导出整局统计，JSON和CSV各一份
+        report = self.summary(rolling=False)
+        try:
+            with open(path_prefix + ".json", "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=4)
+            with open(path_prefix + ".csv", "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["Stage", "Count", "Mean_ms", "P50_ms", "P95_ms", "P99_ms"])
+                for name, s in report.items():
+                    writer.writerow([name, s["count"], s["mean"], s["p50"], s["p95"], s["p99"]])
+        except Exception as e:
+            print(f"Latency Export Error: {e}")
+        return report
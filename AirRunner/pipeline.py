@@ -0,0 +1,265 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+# 帧缓冲池：按形状复用已分配的图像数组，避免每帧申请/释放大块内存
+class BufferPool:
+    def __init__(self):
+        self._free = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, shape):
+        with self._lock:
+            buffers = self._free.get(shape)
+            if buffers:
+                buf = buffers.pop()
+                buf.flags.writeable = True
+                return buf
+        return np.empty(shape, dtype=np.uint8)
+
+    def release(self, buf):
+        if buf is None:
+            return
+        with self._lock:
+            self._free.setdefault(buf.shape, []).append(buf)
+
+
+# 有界队列，满了丢弃最旧的一项，保证下游永远处理最新数据
+class DropOldestQueue:
+    def __init__(self, maxsize=1, on_drop=None):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.on_drop = on_drop  # 被丢弃的项目回调(用于归还缓冲)
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        evicted = None
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+                evicted = self._items[0]
+            self._items.append(item)
+            self._cond.notify()
+        if evicted is not None and self.on_drop is not None:
+            self.on_drop(evicted)
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self.closed, timeout):
+                return None
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+# 在各个阶段之间传递的单帧数据
+class FramePacket:
+    def __init__(self, seq, frame, capture_time):
+        self.seq = seq
+        self.pool = None
+        self.frame = frame  # 显示用BGR帧
+        self.capture_time = capture_time
+        self.stamps = {"capture": capture_time}  # 各阶段完成时间戳(perf_counter)
+        self.rgb = None  # 推理用RGB帧
+        self.points = None  # 推理得到的关键点(全图归一化坐标)
+        self.dark = False
+
+        # 决策阶段填写
+        self.action = "NEUTRAL"
+        self.data = None
+        self.view = "PLAY"  # PLAY / COUNTDOWN / PAUSED / DARK
+        self.countdown = 0
+        self.thresholds = None
+        self.settings_version = None  # 决策时使用的设置版本号
+        self.raw_action = None  # 滤波/预测前的阈值判定结果(遥测用)
+        self.fired = False  # 本帧是否真的发出了按键
+
+    def release_rgb(self):
+        if self.pool is not None:
+            self.pool.release(self.rgb)
+        self.rgb = None
+
+    def release(self):
+        # 渲染完成或被丢弃后，把缓冲还给缓冲池
+        self.release_rgb()
+        if self.pool is not None:
+            self.pool.release(self.frame)
+        self.frame = None
+
+
+# 单个流水线阶段：从上游取数据，处理后放入下游队列
+class PipelineStage(threading.Thread):
+    def __init__(self, name, func, source, sink=None):
+        super().__init__(name=name, daemon=True)
+        self.func = func
+        self.source = source  # 可调用对象 source(timeout) -> item 或 None
+        self.sink = sink
+        self.busy_time = 0  # 累计处理耗时
+        self.processed = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            item = self.source(0.1)
+            if item is None:
+                continue
+            t0 = time.perf_counter()
+            try:
+                out = self.func(item)
+            except Exception as e:
+                print(f"Pipeline Stage Error ({self.name}): {e}")
+                continue
+            t1 = time.perf_counter()
+            self.busy_time += t1 - t0
+            self.processed += 1
+            if out is not None and hasattr(out, "stamps"):
+                out.stamps[self.name] = t1
+            if out is not None and self.sink is not None:
+                self.sink.put(out)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# 采集 -> 预处理 -> 推理 -> 决策 各自一个线程，最终输出给渲染端(调用方线程画HUD)
+# HighGUI的imshow/waitKey需要固定在同一线程，画好的帧交给FrameDisplay，由Tk主线程显示
+class FramePipeline:
+    def __init__(self, grabber, stages, queue_size=1, pool=None):
+        self.grabber = grabber
+        self.pool = pool
+        self.output = DropOldestQueue(queue_size, on_drop=FramePacket.release)
+        self.queues = []
+        self.stages = []
+        self._seq = 0
+
+        source = self._capture_source
+        for i, (name, func) in enumerate(stages):
+            if i == len(stages) - 1:
+                sink = self.output
+            else:
+                sink = DropOldestQueue(queue_size, on_drop=FramePacket.release)
+                self.queues.append(sink)
+            self.stages.append(PipelineStage(name, func, source, sink))
+            source = sink.get
+
+    def _capture_source(self, timeout):
+        ret, frame = self.grabber.read(timeout)
+        if not ret:
+            return None
+        self._seq += 1
+        packet = FramePacket(self._seq, frame, self.grabber.frame_time)
+        packet.pool = self.pool
+        return packet
+
+    def start(self):
+        self.grabber.start()
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    @property
+    def running(self):
+        return self.grabber.isOpened() or len(self.output) > 0
+
+    def get(self, timeout=0.1):
+        return self.output.get(timeout)
+
+    def dropped(self):
+        # 各级队列因丢旧策略丢弃的帧数
+        return {
+            "capture": self.grabber.dropped,
+            **{stage.name: q.dropped for stage, q in zip(self.stages, self.queues + [self.output])}
+        }
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
+        for q in self.queues:
+            q.close()
+        self.output.close()
+        for stage in self.stages:
+            stage.join(timeout=1.0)
+        self.grabber.stop()
+
+
+# 显示端：imshow/waitKey固定在Tk主线程调用
+# macOS只允许主线程创建窗口，Qt后端的HighGUI绑定第一次使用它的线程，游戏线程只画HUD，不碰窗口
+# 画好的帧放进单槽(只留最新一帧)，Tk线程用after()轮询pump()显示，按键和关窗再传回游戏线程
+class FrameDisplay:
+    interval_ms = 5  # Tk线程轮询间隔
+
+    def __init__(self, window_name="AirRunner HUD", size=(640, 480), topmost=True):
+        self.window_name = window_name
+        self.size = size
+        self.topmost = topmost
+        self.frames = DropOldestQueue(1, on_drop=FramePacket.release)
+        self.keys = DropOldestQueue(16)
+        self.closed = threading.Event()  # 用户按了ESC或关闭了窗口
+        self.is_open = False
+
+    def reset(self):
+        # 每局开始时清掉上一局留下的按键和关窗状态，窗口在多局之间保持打开
+        self.closed.clear()
+        while self.keys.get(0) is not None:
+            pass
+
+    def show(self, packet):
+        # 游戏线程调用；显示后(或被新帧挤掉时)由显示端归还缓冲
+        self.frames.put(packet)
+
+    def poll_key(self):
+        return self.keys.get(0)
+
+    def pump(self):
+        # Tk线程调用
+        import cv2
+        packet = self.frames.get(0)
+        if packet is not None:
+            if not self.closed.is_set():
+                if not self.is_open:
+                    self._open()
+                cv2.imshow(self.window_name, packet.frame)
+            packet.release()
+        if not self.is_open:
+            return
+        if cv2.getWindowProperty(self.window_name, cv2.WND_PROP_VISIBLE) < 1:
+            self.closed.set()
+        key = cv2.waitKey(1) & 0xFF
+        if key == 27:
+            self.closed.set()
+        elif key != 0xFF:
+            self.keys.put(key)
+
+    def _open(self):
+        import cv2
+        cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(self.window_name, *self.size)
+        if self.topmost:
+            try:
+                cv2.setWindowProperty(self.window_name, cv2.WND_PROP_TOPMOST, 1)
+            except cv2.error:
+                pass
+        self.is_open = True
+
+    def close(self):
+        # Tk线程调用，会话结束后关闭窗口并归还还没显示的帧
+        packet = self.frames.get(0)
+        if packet is not None:
+            packet.release()
+        if self.is_open:
+            import cv2
+            cv2.destroyAllWindows()
+            cv2.waitKey(1)
+            self.is_open = False
@@ -0,0 +1,150 @@
+import multiprocessing as mproc
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from controllers import HandController, BodyController
+
+
+def _make_controller(mode, settings, load_model=True):
+    if mode == "HAND":
+        return HandController(settings=settings, load_model=load_model)
+    return BodyController(settings=settings, load_model=load_model)
+
+
+# 子进程：持有MediaPipe模型，从共享内存读帧，只回传关键点小数组
+def _worker_main(conn, mode, settings):
+    detector = _make_controller(mode, settings)
+    shm = None
+    frame = None
+    try:
+        while True:
+            msg = conn.recv()
+            kind = msg[0]
+            if kind == "stop":
+                break
+            elif kind == "shm":
+                if shm is not None:
+                    shm.close()
+                # 共享内存由主进程创建和释放，子进程只挂载
+                shm = shared_memory.SharedMemory(name=msg[1])
+                frame = np.ndarray(msg[2], dtype=np.uint8, buffer=shm.buf)
+            elif kind == "complexity":
+                detector.set_model_complexity(msg[1])
+            elif kind == "settings":
+                detector.apply_settings(msg[1])
+            elif kind == "frame":
+                detector.input_scale = msg[2]
+                try:
+                    points = detector.detect(frame)
+                except Exception as e:
+                    print(f"Inference Worker Error: {e}")
+                    points = None
+                conn.send((msg[1], points))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        frame = None
+        if shm is not None:
+            shm.close()
+
+
+# 进程推理后端：与HandController/BodyController接口一致
+# 帧通过共享内存传递(不走pickle)，决策逻辑留在主进程，阈值修改无需通知子进程
+class ProcessDetector:
+    def __init__(self, mode, settings=None, timeout=2.0):
+        self.mode = mode
+        self.timeout = timeout
+        self.input_scale = 1.0
+        self.controller = _make_controller(mode, settings, load_model=False)
+
+        ctx = mproc.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._proc = ctx.Process(target=_worker_main, args=(child_conn, mode, dict(self.controller.settings)),
+                                 daemon=True)
+        self._proc.start()
+        child_conn.close()
+
+        self._shm = None
+        self._buffer = None
+        self._seq = 0
+        self._inflight = None  # 已发给子进程、还没收到结果的帧序号
+
+    def __getattr__(self, name):
+        # 其余接口(preprocess/classify/get_thresholds等)直接用本地的决策控制器
+        if name == "controller":
+            raise AttributeError(name)
+        return getattr(self.controller, name)
+
+    def is_alive(self):
+        return self._proc.is_alive()
+
+    def _ensure_buffer(self, shape):
+        if self._buffer is not None and self._buffer.shape == shape:
+            return
+        self._release_shm()
+        size = int(np.prod(shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._buffer = np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._conn.send(("shm", self._shm.name, shape))
+
+    def _wait_result(self, timeout):
+        # 等待在途帧的结果，收到后共享内存才能写入下一帧
+        while self._inflight is not None and self._conn.poll(timeout):
+            seq, points = self._conn.recv()
+            if seq == self._inflight:
+                self._inflight = None
+                return points
+        return None
+
+    def detect(self, frame_rgb):
+        if not self.is_alive():
+            return None
+        if self._inflight is not None:
+            # 上一帧超时后子进程可能仍在读共享内存，先等它的迟到结果(丢弃)，仍未完成则跳过本帧
+            self._wait_result(self.timeout)
+            if self._inflight is not None:
+                print("Inference Worker Busy")
+                return None
+        self._ensure_buffer(frame_rgb.shape)
+        np.copyto(self._buffer, frame_rgb)
+        self._seq += 1
+        self._inflight = self._seq
+        self._conn.send(("frame", self._seq, self.input_scale))
+        points = self._wait_result(self.timeout)
+        if self._inflight is not None:
+            print("Inference Worker Timeout")
+        return points
+
+    def apply_settings(self, settings):
+        # 阈值只在主进程使用；ROI等推理配置需要同步给子进程
+        self.input_scale = 1.0
+        if not {**self.controller.settings, **settings}.get("governor_enabled", True):
+            # 先通知子进程恢复默认复杂度；本地控制器没有加载模型，不能由它重建
+            self.set_model_complexity(0)
+        self.controller.apply_settings(settings)
+        self._conn.send(("settings", dict(self.controller.settings)))
+
+    def set_model_complexity(self, complexity):
+        if complexity == self.controller.model_complexity:
+            return
+        self.controller.model_complexity = complexity
+        self._conn.send(("complexity", complexity))
+
+    def _release_shm(self):
+        self._buffer = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def close(self):
+        try:
+            self._conn.send(("stop",))
+        except Exception:
+            pass
+        self._proc.join(timeout=2.0)
+        if self._proc.is_alive():
+            self._proc.terminate()
+        self._conn.close()
+        self._release_shm()
@@ -0,0 +1,80 @@
+import numpy as np
+
+
+# 感兴趣区域跟踪：根据上一帧位置和速度预测裁剪框，只把裁剪后的小图送去推理
+# 框内坐标会换算回全图，阈值判定不受影响；丢失目标或到达间隔时回退全图搜索
+class RoiTracker:
+    def __init__(self, size=0.5, margin=0.1, search_interval=30, velocity_gain=2.0):
+        self.size = size  # 裁剪框边长(占画面比例)
+        self.margin = margin  # 额外留边
+        self.search_interval = search_interval  # 每隔N帧强制全图搜索一次
+        self.velocity_gain = velocity_gain  # 运动越快框越大
+
+        self.box = None  # 归一化坐标 (x0, y0, x1, y1)
+        self.center = None
+        self.velocity = (0.0, 0.0)
+        self.frames_since_search = 0
+
+    def reset(self):
+        self.box = None
+        self.center = None
+        self.velocity = (0.0, 0.0)
+
+    def _make_box(self, px, py):
+        vx, vy = self.velocity
+        half = min(self.size / 2 + self.margin + max(abs(vx), abs(vy)) * self.velocity_gain, 0.5)
+        # 贴边时整体平移而不是缩小，保证框大小稳定
+        x0 = min(max(px - half, 0.0), 1.0 - 2 * half)
+        y0 = min(max(py - half, 0.0), 1.0 - 2 * half)
+        return x0, y0, x0 + 2 * half, y0 + 2 * half
+
+    def _inside_inner(self, px, py):
+        # 预测点仍在框的内圈时沿用旧框，避免每帧抖动重裁
+        x0, y0, x1, y1 = self.box
+        return x0 + self.margin <= px <= x1 - self.margin and y0 + self.margin <= py <= y1 - self.margin
+
+    def next_box(self):
+        # 返回本帧使用的归一化裁剪框，None表示全图搜索
+        if self.center is None or self.frames_since_search >= self.search_interval:
+            return None
+        px = self.center[0] + self.velocity[0]
+        py = self.center[1] + self.velocity[1]
+        if self.box is None or not self._inside_inner(px, py):
+            self.box = self._make_box(px, py)
+        return self.box
+
+    def crop(self, frame):
+        # 返回 (推理用图像, 像素裁剪框)；像素框为None表示使用全图
+        box = self.next_box()
+        if box is None:
+            self.frames_since_search = 0
+            return frame, None
+        self.frames_since_search += 1
+
+        h, w = frame.shape[:2]
+        x0, y0 = int(box[0] * w), int(box[1] * h)
+        x1, y1 = int(box[2] * w), int(box[3] * h)
+        return np.ascontiguousarray(frame[y0:y1, x0:x1]), (x0, y0, x1, y1)
+
+    @staticmethod
+    def to_full(points, pixel_box, shape):
+        # 裁剪图内的归一化坐标 -> 全图归一化坐标
+        if points is None or pixel_box is None:
+            return points
+        h, w = shape[:2]
+        x0, y0, x1, y1 = pixel_box
+        full = np.array(points, dtype=np.float64)
+        full[:, 0] = (x0 + full[:, 0] * (x1 - x0)) / w
+        full[:, 1] = (y0 + full[:, 1] * (y1 - y0)) / h
+        return full
+
+    def update(self, center):
+        # center为全图归一化坐标，None表示目标丢失，下一帧全图搜索
+        if center is None:
+            self.reset()
+            return
+        cx, cy = float(center[0]), float(center[1])
+        if self.center is not None:
+            vx, vy = self.velocity
+            self.velocity = (0.5 * vx + 0.5 * (cx - self.center[0]), 0.5 * vy + 0.5 * (cy - self.center[1]))
+        self.center = (cx, cy)
@@ -0,0 +1,114 @@
+import queue
+import threading
+
+
+# 游戏会话管理：游戏主循环在后台线程运行，不阻塞Tk事件循环
+# 进度/结束消息放进线程安全队列，由Tk线程用after()轮询；摄像头在多局之间保持打开
+# HUD窗口属于Tk主线程：后台线程只画帧，交给display，由Tk线程轮询display.pump()显示
+class GameSession:
+    def __init__(self, run_loop, max_messages=100, prober=None, live_settings=None):
+        self.run_loop = run_loop  # run_game_loop(mode, settings, game_url, cap=, stop_event=, progress=, display=)
+        self.prober = prober  # CameraProber，打开摄像头时按探测结果选择模式
+        self.live_settings = live_settings  # SharedSettings，游戏中修改的阈值下一帧生效
+        self.messages = queue.Queue(maxsize=max_messages)
+        self.stop_event = threading.Event()
+        self._thread = None
+        self._restart = False
+        self._cap = None
+        self._cap_source = None
+        self._last_args = None
+        self.display = None  # pipeline.FrameDisplay，第一次开始游戏时创建
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _post(self, kind, data=None):
+        # 队列满时丢弃最旧的消息(都是进度更新)，保证结束消息能送达
+        while True:
+            try:
+                self.messages.put_nowait((kind, data))
+                return
+            except queue.Full:
+                try:
+                    self.messages.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _camera(self, source):
+        # 同一摄像头/视频源重复使用，只有换源或断开时才重新打开
+        from camera_probe import configure_capture
+        from capture import open_source, is_camera_source
+        if self._cap is not None and self._cap_source == source and self._cap.isOpened():
+            return self._cap
+        self.release_camera()
+        self._cap = open_source(source, paced=True)
+        self._cap_source = source
+        if is_camera_source(source) and self._cap.isOpened():
+            configure_capture(self._cap, int(source), self.prober)
+        return self._cap
+
+    def start(self, mode, settings, game_url=None, source=None):
+        if self.running:
+            return False
+        if self.display is None:
+            from pipeline import FrameDisplay
+            self.display = FrameDisplay()
+        self.stop_event.clear()
+        self._restart = False
+        self._last_args = (mode, settings, source)
+        self._thread = threading.Thread(target=self._worker, args=(mode, settings, game_url, source), daemon=True)
+        self._thread.start()
+        return True
+
+    def _worker(self, mode, settings, game_url, source):
+        while True:
+            try:
+                cap = self._camera(settings.get("camera_index", 0) if source is None else source)
+                stats = self.run_loop(mode, settings, game_url, cap=cap, stop_event=self.stop_event,
+                                      progress=lambda data: self._post("progress", data),
+                                      live_settings=self.live_settings, display=self.display)
+            except Exception as e:
+                print(f"Loop Error: {e}")
+                self._post("error", str(e))
+                return
+            if not self._restart:
+                self._post("finished", stats)
+                return
+            # 重开：沿用摄像头和已加载的模型，不再重复打开游戏网页
+            self._restart = False
+            self.stop_event.clear()
+            game_url = None
+            self._post("restarted", stats)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def restart(self):
+        # 运行中则结束当前一局后立即开始新一局，否则按上次的参数重新开始
+        if self.running:
+            self._restart = True
+            self.stop_event.set()
+            return True
+        if self._last_args is None:
+            return False
+        mode, settings, source = self._last_args
+        return self.start(mode, settings, source=source)
+
+    def release_camera(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+            self._cap_source = None
+
+    def close_display(self):
+        # 只能在Tk线程调用
+        if self.display is not None:
+            self.display.close()
+
+    def close(self, timeout=3.0):
+        self.stop()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.release_camera()
+        self.close_display()
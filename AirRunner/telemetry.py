@@ -0,0 +1,133 @@
+import os
+import queue
+import threading
+import zipfile
+from collections import deque
+
+import numpy as np
+
+from controllers import ACTIONS
+from lazy_import import module_available
+
+# 每帧一行：时间、控制点坐标、阈值判定的原始动作、滤波/预测后的动作、是否真的发出按键、各阶段耗时
+TELEMETRY_DTYPE = np.dtype([
+    ("t", "f8"),  # 采集时间(perf_counter)
+    ("x", "f4"),  # 控制点归一化坐标，未检测到人时为NaN
+    ("y", "f4"),
+    ("raw", "i1"),  # ACTIONS编码，-1为其它(倒计时等)
+    ("action", "i1"),
+    ("fired", "?"),
+    ("preprocess_ms", "f4"),
+    ("inference_ms", "f4"),
+    ("decision_ms", "f4"),
+])
+ACTION_CODES = {name: i for i, name in enumerate(ACTIONS)}
+_SPANS = [("preprocess_ms", "capture", "preprocess"), ("inference_ms", "preprocess", "inference"),
+          ("decision_ms", "inference", "decision")]
+
+
+def telemetry_format():
+    # 装了pyarrow时写Parquet，否则写npz(每个数据块一个数组)
+    return "parquet" if module_available("pyarrow") else "npz"
+
+
+class _NpzChunkWriter:
+    def __init__(self, path):
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._index = 0
+
+    def write(self, chunk):
+        with self._zip.open(f"chunk_{self._index:05d}.npy", "w", force_zip64=True) as f:
+            np.lib.format.write_array(f, chunk, allow_pickle=False)
+        self._index += 1
+
+    def close(self):
+        self._zip.close()
+
+
+class _ParquetChunkWriter:
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._writer = pq.ParquetWriter(path, pa.schema([(name, pa.from_numpy_dtype(TELEMETRY_DTYPE[name]))
+                                                          for name in TELEMETRY_DTYPE.names]))
+
+    def write(self, chunk):
+        # 每个数据块写成一个row group
+        self._writer.write_table(self._pa.table({name: chunk[name] for name in TELEMETRY_DTYPE.names}))
+
+    def close(self):
+        self._writer.close()
+
+
+# 逐帧遥测：写入预分配的结构化数组，写满一块交给后台线程落盘，决策线程里只做一次行赋值
+class TelemetryLog:
+    def __init__(self, path, chunk_size=2048, buffers=3):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.frames = 0
+        self._free = deque(np.empty(chunk_size, dtype=TELEMETRY_DTYPE) for _ in range(buffers))
+        self._buffer = self._free.popleft()
+        self._count = 0
+        self._chunks = queue.Queue()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._writer = (_ParquetChunkWriter if path.endswith(".parquet") else _NpzChunkWriter)(path)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add(self, t, points, center_index, raw, action, fired, stamps):
+        if points is None:
+            x = y = np.nan
+        else:
+            x, y = points[center_index]
+        spans = [(stamps[end] - stamps[start]) * 1000 if start in stamps and end in stamps else np.nan
+                 for _, start, end in _SPANS]
+        self._buffer[self._count] = (t, x, y, ACTION_CODES.get(raw, -1), ACTION_CODES.get(action, -1), fired, *spans)
+        self._count += 1
+        self.frames += 1
+        if self._count == self.chunk_size:
+            self._hand_off(self._buffer)
+
+    def _hand_off(self, chunk):
+        self._chunks.put(chunk)
+        # 写盘跟不上时临时多分配一块，不阻塞游戏循环
+        self._buffer = self._free.popleft() if self._free else np.empty(self.chunk_size, dtype=TELEMETRY_DTYPE)
+        self._count = 0
+
+    def _run(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                return
+            try:
+                self._writer.write(chunk)
+            except Exception as e:
+                print(f"Telemetry Write Error: {e}")
+            if len(chunk) == self.chunk_size:
+                self._free.append(chunk)
+
+    def close(self):
+        # 写出未满的最后一块，等待后台线程写完
+        if self._count:
+            self._chunks.put(self._buffer[:self._count].copy())
+            self._count = 0
+        self._chunks.put(None)
+        self._thread.join()
+        self._writer.close()
+
+
+def load_telemetry(path):
+    # 读回整局遥测，返回TELEMETRY_DTYPE结构化数组
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+        data = np.empty(table.num_rows, dtype=TELEMETRY_DTYPE)
+        for name in TELEMETRY_DTYPE.names:
+            data[name] = table.column(name).to_numpy()
+        return data
+    with np.load(path) as chunks:
+        names = sorted(chunks.files)
+        if not names:
+            return np.empty(0, dtype=TELEMETRY_DTYPE)
+        return np.concatenate([chunks[name] for name in names])
@@ -0,0 +1,131 @@
+import json
+
+from camera_probe import CameraProber, best_mode, configure_capture
+
+MODES = [
+    {"fourcc": "MJPG", "width": 1280, "height": 720, "fps": [30.0]},
+    {"fourcc": "YUYV", "width": 640, "height": 480, "fps": [30.0, 15.0]},
+    {"fourcc": "MJPG", "width": 640, "height": 480, "fps": [30.0]},
+    {"fourcc": "YUYV", "width": 320, "height": 240, "fps": [60.0]},
+]
+
+
+class FakeEnumerator:
+    def __init__(self, devices, modes=MODES):
+        self.devices = devices
+        self.modes = modes
+        self.probed = []
+
+    def list_devices(self):
+        return [dict(d) for d in self.devices]
+
+    def probe(self, device):
+        self.probed.append(device["identity"])
+        return self.modes
+
+
+def _device(index, identity):
+    return {"index": index, "path": f"/dev/video{index}", "name": identity, "identity": identity}
+
+
+def test_best_mode_ordering():
+    # 不小于目标尺寸的最小分辨率优先，同一分辨率里帧率最高优先，同等条件下未压缩格式优先
+    assert best_mode(MODES) == {"fourcc": "YUYV", "width": 640, "height": 480, "fps": [30.0, 15.0]}
+    # 320x240虽然帧率更高，但小于目标尺寸
+    assert best_mode(MODES, (320, 240))["width"] == 320
+    assert best_mode(MODES, (1280, 720))["width"] == 1280
+    # 没有够大的模式时在全部模式里选
+    assert best_mode(MODES, (1920, 1080))["fps"] == [60.0]
+    assert best_mode([{"fourcc": "MJPG", "width": 640, "height": 480, "fps": []}]) is not None
+    assert best_mode([]) is None
+
+
+def test_best_mode_prefers_smallest_fitting_size():
+    # 720p@60的MJPG虽然帧率更高，但像素多一倍还要解码，选640x480
+    modes = [
+        {"fourcc": "MJPG", "width": 1280, "height": 720, "fps": [60.0, 30.0]},
+        {"fourcc": "YUYV", "width": 640, "height": 480, "fps": [30.0]},
+    ]
+    assert best_mode(modes) == modes[1]
+    # 同一分辨率里仍按帧率和格式选
+    modes += [{"fourcc": "MJPG", "width": 640, "height": 480, "fps": [60.0]},
+              {"fourcc": "YUYV", "width": 640, "height": 480, "fps": [60.0]}]
+    assert best_mode(modes) == modes[3]
+
+
+def test_cache_hit_and_miss(tmp_path):
+    cache_path = str(tmp_path / "camera_cache.json")
+    enumerator = FakeEnumerator([_device(0, "uvc|Cam A|usb-1"), _device(2, "uvc|Cam B|usb-2")])
+    devices = CameraProber(enumerator, cache_path).probe_all()
+    assert enumerator.probed == ["uvc|Cam A|usb-1", "uvc|Cam B|usb-2"]
+    assert [d["modes"] for d in devices] == [MODES, MODES]
+
+    # 同一身份的设备直接读缓存
+    enumerator.probed.clear()
+    CameraProber(enumerator, cache_path).probe_all()
+    assert enumerator.probed == []
+
+    # 换了设备(身份不同)才探测新设备，refresh时全部重新探测
+    enumerator.devices[1] = _device(2, "uvc|Cam C|usb-2")
+    CameraProber(enumerator, cache_path).probe_all()
+    assert enumerator.probed == ["uvc|Cam C|usb-2"]
+    enumerator.probed.clear()
+    CameraProber(enumerator, cache_path).probe_all(refresh=True)
+    assert enumerator.probed == ["uvc|Cam A|usb-1", "uvc|Cam C|usb-2"]
+
+
+def test_index_remap(tmp_path):
+    cache_path = str(tmp_path / "camera_cache.json")
+    CameraProber(FakeEnumerator([_device(0, "uvc|Cam A|usb-1")]), cache_path).probe_all()
+
+    # 重新插拔后编号变化：沿用缓存的能力，只更新编号
+    enumerator = FakeEnumerator([_device(3, "uvc|Cam A|usb-1")])
+    prober = CameraProber(enumerator, cache_path)
+    prober.probe_all()
+    assert enumerator.probed == []
+    assert prober.find(0) is None
+    assert prober.find(3)["modes"] == MODES
+    with open(cache_path, encoding="utf-8") as f:
+        assert json.load(f)["uvc|Cam A|usb-1"]["index"] == 3
+
+
+def test_best_mode_for_before_probe(tmp_path):
+    cache_path = str(tmp_path / "camera_cache.json")
+    CameraProber(FakeEnumerator([_device(1, "uvc|Cam A|usb-1")]), cache_path).probe_all()
+
+    # 探测还没结束时只查缓存，不调用枚举器
+    enumerator = FakeEnumerator([])
+    prober = CameraProber(enumerator, cache_path)
+    assert prober.devices is None
+    assert prober.best_mode_for(1) == best_mode(MODES)
+    assert prober.best_mode_for(0) is None
+    assert enumerator.probed == []
+
+    # 探测完成后以实际设备列表为准
+    prober.probe_all()
+    assert prober.best_mode_for(1) is None
+
+
+def test_probe_in_background(tmp_path):
+    prober = CameraProber(FakeEnumerator([_device(0, "uvc|Cam A|usb-1")]), str(tmp_path / "camera_cache.json"))
+    prober.start()
+    assert prober.wait(5)
+    assert prober.done and prober.error is None
+    assert prober.find(0)["modes"] == MODES
+
+
+class FakeCapture:
+    def __init__(self):
+        self.props = {}
+
+    def set(self, prop, value):
+        self.props[prop] = value
+        return True
+
+
+def test_configure_capture_without_probe(tmp_path):
+    # 没有探测结果时保持固定的640x480
+    prober = CameraProber(FakeEnumerator([]), str(tmp_path / "camera_cache.json"))
+    cap = FakeCapture()
+    assert configure_capture(cap, 0, prober) is None
+    assert cap.props == {3: 640, 4: 480}
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from controllers import ACTIONS, THRESH_KEYS, BaseController, classify_grid
+
+
+def _controller(thresholds):
+    return BaseController(dict(zip(THRESH_KEYS, thresholds)))
+
+
+def test_classify_grid_matches_threshold_action():
+    # 向量化判定与逐帧if/elif在随机坐标、阈值边界和缺失帧上结果一致
+    rng = np.random.default_rng(0)
+    thresholds = [[0.4, 0.6, 0.4, 0.6], [0.3, 0.7, 0.35, 0.65], [0.5, 0.5, 0.5, 0.5], [0.45, 0.55, 0.2, 0.9]]
+    positions = rng.random((500, 2))
+    edges = np.array([[t, t] for row in thresholds for t in row])  # 恰好落在阈值上
+    positions = np.vstack([positions, edges, [[np.nan, np.nan], [0.1, np.nan], [np.nan, 0.9]]])
+
+    codes = classify_grid(positions, thresholds)
+    assert codes.shape == (len(thresholds), len(positions))
+    for row, values in zip(codes, thresholds):
+        controller = _controller(values)
+        expected = [controller._threshold_action(x, y) for x, y in positions]
+        assert [ACTIONS[c] for c in row] == expected
+
+
+def test_classify_batch_pause_mask():
+    controller = _controller([0.4, 0.6, 0.4, 0.6])
+    points = np.array([[[0.5, 0.3]], [[0.5, 0.5]], [[0.3, 0.5]]])
+    assert [ACTIONS[c] for c in controller.classify_batch(points)] == ["JUMP", "NEUTRAL", "LEFT"]
+    controller.pause_mask = lambda p: np.array([False, True, False])
+    assert [ACTIONS[c] for c in controller.classify_batch(points)] == ["JUMP", "PAUSE", "LEFT"]
+
+
+@pytest.mark.parametrize("x, y, action", [
+    (0.5, 0.39, "JUMP"), (0.5, 0.4, "NEUTRAL"), (0.5, 0.61, "DUCK"),
+    (0.39, 0.5, "LEFT"), (0.61, 0.5, "RIGHT"), (0.3, 0.3, "JUMP"), (0.7, 0.7, "DUCK"),
+])
+def test_classify(x, y, action):
+    controller = _controller([0.4, 0.6, 0.4, 0.6])
+    assert controller.classify(np.array([[x, y]]), (480, 640, 3)) == (action, (int(x * 640), int(y * 480)))
+
+
+class _ModelController(BaseController):
+    # 不加载MediaPipe，只记录模型重建次数
+    def __init__(self, settings=None):
+        super().__init__(settings)
+        self.builds = 0
+
+    def _build_model(self):
+        self.builds += 1
+        return self.model_complexity
+
+    def _set_model(self, model):
+        self.model = model
+
+
+def test_apply_settings_resets_model_complexity():
+    controller = _ModelController()
+    controller.set_model_complexity(1)
+    # 开启降级调度时复杂度由调度器决定，保持不变
+    controller.apply_settings({"governor_enabled": True})
+    assert controller.model_complexity == 1
+    controller.apply_settings({"governor_enabled": False})
+    assert (controller.model_complexity, controller.model, controller.builds) == (0, 0, 2)
+    controller.apply_settings({"governor_enabled": False})
+    assert controller.builds == 2
@@ -0,0 +1,52 @@
+import numpy as np
+
+from controllers import BaseController
+from filters import ActionFilter
+
+SHAPE = (480, 640, 3)
+
+
+def _filter(band=0.03):
+    detector = BaseController({"jump_thresh": 0.4, "duck_thresh": 0.6, "left_thresh": 0.4, "right_thresh": 0.6})
+    # 截止频率取很大，平滑几乎不起作用，只测试滞回
+    return ActionFilter(detector, min_cutoff=1e6, beta=0.0, band=band)
+
+
+def _run(action_filter, positions, fps=30):
+    return [action_filter.classify(None if p is None else np.array([p]), SHAPE, i / fps)[0]
+            for i, p in enumerate(positions)]
+
+
+def test_hysteresis_holds_inside_band():
+    # 进入仍在阈值处触发，退回阈值后band以内保持，越过band才回到NEUTRAL
+    actions = _run(_filter(), [(0.5, 0.5), (0.5, 0.39), (0.5, 0.41), (0.5, 0.425), (0.5, 0.435), (0.5, 0.41)])
+    assert actions == ["NEUTRAL", "JUMP", "JUMP", "JUMP", "NEUTRAL", "NEUTRAL"]
+
+
+def test_jitter_around_threshold():
+    # 阈值附近来回抖动只触发一次
+    positions = [(0.5, 0.5)] + [(0.5, 0.39 if i % 2 else 0.41) for i in range(1, 20)]
+    actions = _run(_filter(), positions)
+    assert actions[1:] == ["JUMP"] * 19
+    actions = _run(_filter(band=0.0), positions)
+    assert actions[1:] == ["JUMP" if i % 2 else "NEUTRAL" for i in range(1, 20)]
+
+
+def test_each_side():
+    for enter, leave, out, action in [((0.5, 0.61), (0.5, 0.58), (0.5, 0.56), "DUCK"),
+                                      ((0.39, 0.5), (0.42, 0.5), (0.44, 0.5), "LEFT"),
+                                      ((0.61, 0.5), (0.58, 0.5), (0.56, 0.5), "RIGHT")]:
+        assert _run(_filter(), [enter, leave, out]) == [action, action, "NEUTRAL"]
+
+
+def test_higher_priority_breaks_hold():
+    # 保持LEFT时越过跳跃阈值立即切换；保持JUMP时进入左移区不会切换
+    assert _run(_filter(), [(0.39, 0.5), (0.41, 0.39)]) == ["LEFT", "JUMP"]
+    assert _run(_filter(), [(0.5, 0.39), (0.39, 0.41)]) == ["JUMP", "JUMP"]
+    assert _run(_filter(), [(0.5, 0.39), (0.39, 0.45)]) == ["JUMP", "LEFT"]
+
+
+def test_lost_target_resets():
+    action_filter = _filter()
+    assert _run(action_filter, [(0.5, 0.39), None, (0.5, 0.41)]) == ["JUMP", "NEUTRAL", "NEUTRAL"]
+    assert action_filter.held == "NEUTRAL"
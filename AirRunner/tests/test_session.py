@@ -0,0 +1,142 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from pipeline import FrameDisplay, FramePacket
+from session import GameSession
+
+
+class FakeHighGui(types.ModuleType):
+    # 记录HighGUI调用所在的线程
+    WINDOW_NORMAL = 0
+    WND_PROP_TOPMOST = 5
+    WND_PROP_VISIBLE = 4
+    error = Exception
+
+    def __init__(self):
+        super().__init__("cv2")
+        self.calls = []
+        self.pending_keys = []
+
+    def _record(self, name):
+        self.calls.append((name, threading.get_ident()))
+
+    def namedWindow(self, *args):
+        self._record("namedWindow")
+
+    def resizeWindow(self, *args):
+        self._record("resizeWindow")
+
+    def setWindowProperty(self, *args):
+        self._record("setWindowProperty")
+
+    def imshow(self, name, frame):
+        self._record("imshow")
+
+    def getWindowProperty(self, *args):
+        self._record("getWindowProperty")
+        return 1.0
+
+    def waitKey(self, delay):
+        self._record("waitKey")
+        return self.pending_keys.pop(0) if self.pending_keys else -1
+
+    def destroyAllWindows(self):
+        self._record("destroyAllWindows")
+
+
+class RecordingPool:
+    def __init__(self):
+        self.released = []
+
+    def release(self, buf):
+        if buf is not None:
+            self.released.append(buf)
+
+
+class FakePacket(FramePacket):
+    def __init__(self, frame):
+        super().__init__(0, frame, 0.0)
+        self.pool = RecordingPool()
+
+    @property
+    def released(self):
+        return self.frame is None
+
+
+@pytest.fixture
+def highgui(monkeypatch):
+    fake = FakeHighGui()
+    monkeypatch.setitem(sys.modules, "cv2", fake)
+    return fake
+
+
+def test_display_keeps_latest_frame(highgui):
+    display = FrameDisplay()
+    first, second = FakePacket(1), FakePacket(2)
+    display.show(first)
+    display.show(second)
+    # 没来得及显示的旧帧直接归还缓冲
+    assert first.released and not second.released
+    display.pump()
+    assert second.released
+    assert [name for name, _ in highgui.calls].count("imshow") == 1
+    display.close()
+    assert not display.is_open
+
+
+def test_display_keys_and_close(highgui):
+    display = FrameDisplay()
+    display.show(FakePacket(1))
+    highgui.pending_keys = [ord("l")]
+    display.pump()
+    assert display.poll_key() == ord("l")
+    assert display.poll_key() is None
+    highgui.pending_keys = [27]
+    display.pump()
+    assert display.closed.is_set()
+    # 关闭后的帧不再显示，窗口不会被重新创建
+    late = FakePacket(2)
+    display.show(late)
+    display.pump()
+    assert late.released
+    assert [name for name, _ in highgui.calls].count("imshow") == 1
+    display.reset()
+    assert not display.closed.is_set()
+
+
+def test_highgui_stays_on_tk_thread(highgui):
+    # 游戏循环在后台线程只交出帧，所有HighGUI调用都在轮询pump()的线程(Tk主线程)
+    rounds = []
+
+    def run_loop(mode, settings, game_url, cap=None, stop_event=None, progress=None, live_settings=None,
+                 display=None):
+        display.reset()
+        rounds.append(display)
+        while not stop_event.is_set():
+            display.show(FakePacket(len(rounds)))
+            time.sleep(0.005)
+        return {"JUMP": len(rounds)}
+
+    session = GameSession(run_loop)
+    session._camera = lambda source: None
+    session.start("BODY", {})
+    deadline = time.time() + 2
+    restarted = False
+    while session.running and time.time() < deadline:
+        session.display.pump()
+        if not restarted and len(rounds) == 1 and session.display.is_open:
+            session.restart()
+            restarted = True
+        elif len(rounds) == 2:
+            session.stop()
+        time.sleep(0.002)
+    session.close()
+
+    assert len(rounds) == 2 and rounds[0] is rounds[1]
+    names = [name for name, _ in highgui.calls]
+    assert "imshow" in names and names.count("namedWindow") == 1
+    assert {ident for _, ident in highgui.calls} == {threading.get_ident()}
@@ -0,0 +1,76 @@
+import struct
+
+import pytest
+
+uinput_backend = pytest.importorskip("uinput_backend")  # 依赖fcntl，仅Linux
+from uinput_backend import (_EVENT, _USER_DEV, BUS_USB, DEVICE_NAME, EV_KEY, EV_SYN, KEY_CODES, SYN_REPORT,
+                            UinputKeyboard, read_events)
+
+
+@pytest.fixture
+def keyboard(tmp_path):
+    # 普通文件代替 /dev/uinput：跳过ioctl，只写事件流
+    path = tmp_path / "uinput"
+    path.touch()
+    kb = UinputKeyboard(str(path))
+    yield kb, str(path)
+    kb.close()
+
+
+def test_event_layout():
+    # struct input_event: 两个long的timeval + __u16 type + __u16 code + __s32 value
+    long_size = struct.calcsize("l")
+    assert _EVENT.size == 2 * long_size + 8
+    raw = _EVENT.pack(0, 0, EV_KEY, 103, 1)
+    assert raw[2 * long_size:] == struct.pack("HHi", EV_KEY, 103, 1)
+
+
+def test_user_dev_layout():
+    # struct uinput_user_dev 共1116字节：name[80] + input_id(4个__u16) + ff_effects_max + 4个[64]的abs数组
+    assert _USER_DEV.size == 80 + 4 * 2 + 4 + 4 * 64 * 4
+    raw = _USER_DEV.pack(DEVICE_NAME, BUS_USB, 0x1, 0x2, 3, 0, *range(256))
+    assert raw[:80].rstrip(b"\0") == DEVICE_NAME
+    assert struct.unpack_from("HHHH", raw, 80) == (BUS_USB, 0x1, 0x2, 3)
+    assert struct.unpack_from("i", raw, 88) == (0,)
+    # absmax / absmin / absfuzz / absflat 依次排列
+    for i in range(4):
+        assert struct.unpack_from("64i", raw, 92 + i * 256) == tuple(range(i * 64, (i + 1) * 64))
+
+
+def test_key_down_up(keyboard):
+    kb, path = keyboard
+    assert not kb.is_device
+    kb.keyDown("down")
+    kb.keyUp("down")
+    assert read_events(path) == [
+        (EV_KEY, KEY_CODES["down"], 1), (EV_SYN, SYN_REPORT, 0),
+        (EV_KEY, KEY_CODES["down"], 0), (EV_SYN, SYN_REPORT, 0),
+    ]
+
+
+def test_press_single_write(keyboard):
+    kb, path = keyboard
+    kb.press("up")
+    with open(path, "rb") as f:
+        data = f.read()
+    assert len(data) == 4 * _EVENT.size
+    # 时间戳填0，由内核补上
+    assert all(_EVENT.unpack_from(data, i)[:2] == (0, 0) for i in range(0, len(data), _EVENT.size))
+    assert read_events(path) == [
+        (EV_KEY, KEY_CODES["up"], 1), (EV_SYN, SYN_REPORT, 0),
+        (EV_KEY, KEY_CODES["up"], 0), (EV_SYN, SYN_REPORT, 0),
+    ]
+
+
+def test_unsupported_key(keyboard):
+    kb, path = keyboard
+    with pytest.raises(ValueError):
+        kb.press("f13")
+    assert read_events(path) == []
+
+
+def test_close_twice(keyboard):
+    kb, _ = keyboard
+    kb.close()
+    kb.close()
+    assert kb.fd is None
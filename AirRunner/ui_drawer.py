@@ -1,6 +1,24 @@
+import time
+from functools import lru_cache
+
 import cv2
 import numpy as np
-import time
+
+
+def blend_color(img, color, alpha):
+    # 原地与纯色半透明混合：img = img*(1-alpha) + color*alpha
+    # img可以是整帧的切片视图，只处理受影响区域，不复制整帧
+    if img.size == 0:
+        return img
+    cv2.convertScaleAbs(img, dst=img, alpha=1 - alpha)
+    cv2.add(img, tuple(c * alpha for c in color) + (0,), dst=img)
+    return img
+
+
+@lru_cache(maxsize=256)
+def text_size(text, scale, thickness, font=None):
+    # 同一字符串的文字尺寸只算一次
+    return cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX if font is None else font, scale, thickness)
 
 
 class CyberHUD:
@@ -17,11 +35,87 @@ class CyberHUD:
         self.prev_time = time.time()
         self.fps = 0
 
+        # 静态图层缓存：标题栏/LOGO/提示文字/参考线/安全区，按(画面尺寸, 阈值, 配色)预渲染
+        # 传入设置版本号时按(画面尺寸, 版本号)缓存，每帧不必再比较阈值和配色
+        self.header_h = 60
+        self._layer = None
+        self._layer_key = None
+
+    def invalidate(self):
+        # 配色或布局变化时调用，下一帧重新预渲染静态图层
+        self._layer = None
+        self._layer_key = None
+
+    def _theme(self):
+        return (self.C_BG_HEADER, self.C_ACCENT, self.C_TEXT_MAIN, self.C_TEXT_DARK, self.C_GUIDE)
+
+    def _guide_geometry(self, shape, thresh):
+        h, w = shape[:2]
+        return int(thresh['jump'] * h), int(thresh['duck'] * h), int(thresh['left'] * w), int(thresh['right'] * w)
+
+    def _build_layer(self, shape, thresh):
+        h, w = shape[:2]
+        # 颜色图与掩码分开绘制：掩码255为不透明像素，半透明区域另记矩形，合成时统一处理
+        color = np.zeros((h, w, 3), dtype=np.uint8)
+        mask = np.zeros((h, w), dtype=np.uint8)
+        y_jump, y_duck, x_left, x_right = self._guide_geometry(shape, thresh)
+
+        x0, x1 = sorted((min(max(x_left, 0), w - 1), min(max(x_right, 0), w - 1)))
+        y0, y1 = sorted((min(max(y_jump, 0), h - 1), min(max(y_duck, 0), h - 1)))
+        zone = (slice(y0, y1 + 1), slice(x0, x1 + 1))
+
+        for p0, p1 in [((0, y_jump), (w, y_jump)), ((0, y_duck), (w, y_duck)),
+                       ((x_left, 0), (x_left, h)), ((x_right, 0), (x_right, h))]:
+            cv2.line(color, p0, p1, self.C_GUIDE, 2)
+            cv2.line(mask, p0, p1, 255, 2)
+
+        # 标题栏单独一层(含底部白线)，在动作反馈和手势光标之后合成，与原先绘制顺序一致
+        # 文字都在标题栏内，掩码只需画底板
+        header_h = self.header_h
+        header_color = np.zeros((header_h + 4, w, 3), dtype=np.uint8)
+        header_mask = np.zeros((header_h + 4, w), dtype=np.uint8)
+        cv2.rectangle(header_color, (0, 0), (w, header_h), self.C_BG_HEADER, -1)
+        cv2.line(header_color, (0, header_h), (w, header_h), (255, 255, 255), 3)
+        cv2.rectangle(header_mask, (0, 0), (w, header_h), 255, -1)
+        cv2.line(header_mask, (0, header_h), (w, header_h), 255, 3)
+
+        self._draw_text_with_outline(header_color, "AIR RUNNER", (20, 42), 1.0, self.C_ACCENT, 2)
+        (logo_w, _), _ = text_size("AIR RUNNER", 1.0, 2)
+        hint_x = 20 + logo_w + 15
+        cv2.putText(header_color, "[ESC to EXIT]", (hint_x, 42), cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.C_TEXT_MAIN, 1)
+
+        return {
+            "color": color,
+            "mask": mask,
+            "header_color": header_color,
+            "header_mask": header_mask,
+            "zones": [(zone, (255, 255, 255), 0.15)],
+            "guides": (y_jump, y_duck, x_left, x_right),
+        }
+
+    def _get_layer(self, shape, thresh, version=None):
+        if version is None:
+            key = (shape[:2], tuple(sorted(thresh.items())), self._theme())
+        else:
+            key = (shape[:2], version)
+        if key != self._layer_key:
+            self._layer = self._build_layer(shape, thresh)
+            self._layer_key = key
+        return self._layer
+
+    def _composite_layer(self, img, layer):
+        # 半透明区只混合各自矩形，不透明部分按掩码一次性拷贝
+        for region, color, alpha in layer["zones"]:
+            blend_color(img[region], color, alpha)
+        cv2.copyTo(layer["color"], layer["mask"], img)
+
+    def _composite_header(self, img, layer):
+        top = img[:layer["header_mask"].shape[0]]
+        cv2.copyTo(layer["header_color"], layer["header_mask"], top)
+
     def draw_warning(self, frame, message):
         h, w, _ = frame.shape
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, 0), (w, h), (0, 0, 255), -1)
-        cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
+        blend_color(frame, (0, 0, 255), 0.3)
 
         self._draw_text_with_outline(frame, "WARNING", (w // 2 - 100, h // 2 - 20), 1.5, self.C_WARN, 3,
                                      (255, 255, 255))
@@ -32,9 +126,7 @@ class CyberHUD:
     def draw_auto_pause(self, frame):
         h, w, _ = frame.shape
         # 变暗背景
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, 0), (w, h), (30, 30, 30), -1)
-        cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
+        blend_color(frame, (30, 30, 30), 0.6)
 
         cx, cy = w // 2, h // 2
         # 绘制暂停图标
@@ -45,12 +137,14 @@ class CyberHUD:
         self._draw_text_with_outline(frame, "User Not Detected", (cx - 110, cy + 140), 0.7, self.C_GUIDE, 1)
         return frame
 
-    def draw_interface(self, frame, action, hand_pos, thresholds, countdown=0):
+    def draw_interface(self, frame, action, hand_pos, thresholds, countdown=0, version=None):
         curr_time = time.time()
         self.fps = 1 / (curr_time - self.prev_time + 1e-5)
         self.prev_time = curr_time
 
-        self._draw_guidelines(frame, thresholds, action)
+        layer = self._get_layer(frame.shape, thresholds, version)
+        self._composite_layer(frame, layer)
+        self._draw_active_guides(frame, layer["guides"], action)
 
         if action != "NEUTRAL":
             self._draw_action_feedback(frame, action)
@@ -63,7 +157,8 @@ class CyberHUD:
             cv2.line(frame, (cx - 22, cy), (cx + 22, cy), self.C_TEXT_MAIN, 2)
             cv2.line(frame, (cx, cy - 22), (cx, cy + 22), self.C_TEXT_MAIN, 2)
 
-        self._draw_status_bar(frame, action)
+        self._composite_header(frame, layer)
+        self._draw_status_dynamic(frame, action)
 
         if countdown > 0:
             self._draw_countdown(frame, countdown)
@@ -92,46 +187,31 @@ class CyberHUD:
         cv2.putText(img, text, pos, font, scale, outline_color, thickness + 3)
         cv2.putText(img, text, pos, font, scale, color, thickness)
 
-    def _draw_guidelines(self, img, thresh, action):
-        h, w, _ = img.shape
-        y_jump = int(thresh['jump'] * h)
-        y_duck = int(thresh['duck'] * h)
-        x_left = int(thresh['left'] * w)
-        x_right = int(thresh['right'] * w)
-
-        overlay = img.copy()
-        cv2.rectangle(overlay, (x_left, y_jump), (x_right, y_duck), (255, 255, 255), -1)
-        cv2.addWeighted(overlay, 0.15, img, 0.85, 0, img)
+    def _draw_active_guides(self, img, guides, action):
+        # 静态图层里是默认样式的参考线，这里只重画当前动作对应的高亮线
+        # 画在标题栏下方的视图里，不会盖住标题栏
+        top = self.header_h + 2
+        body = img[top:]
+        h, w, _ = body.shape
+        y_jump, y_duck, x_left, x_right = guides
+        if action in ["JUMP", "DUCK"]:
+            y = (y_jump if action == "JUMP" else y_duck) - top
+            cv2.line(body, (0, y), (w, y), self.C_WARN, 4)
+            # 原先竖线画在横线之后，交叉处补画竖线
+            cv2.line(body, (x_left, y - 4), (x_left, y + 4), self.C_GUIDE, 2)
+            cv2.line(body, (x_right, y - 4), (x_right, y + 4), self.C_GUIDE, 2)
+        elif action in ["LEFT", "RIGHT"]:
+            cv2.line(body, (x_left, 0), (x_left, h), self.C_WARN, 2)
+            cv2.line(body, (x_right, 0), (x_right, h), self.C_WARN, 2)
 
-        c = self.C_WARN if action == "JUMP" else self.C_GUIDE
-        t = 4 if action == "JUMP" else 2
-        cv2.line(img, (0, y_jump), (w, y_jump), c, t)
-
-        c = self.C_WARN if action == "DUCK" else self.C_GUIDE
-        t = 4 if action == "DUCK" else 2
-        cv2.line(img, (0, y_duck), (w, y_duck), c, t)
-
-        color_lr = self.C_WARN if action in ["LEFT", "RIGHT"] else self.C_GUIDE
-        cv2.line(img, (x_left, 0), (x_left, h), color_lr, 2)
-        cv2.line(img, (x_right, 0), (x_right, h), color_lr, 2)
-
-    def _draw_status_bar(self, img, action):
+    def _draw_status_dynamic(self, img, action):
+        # 标题栏底图来自静态图层，每帧只画动作标签和FPS
         h, w, _ = img.shape
-        header_h = 60
-        cv2.rectangle(img, (0, 0), (w, header_h), self.C_BG_HEADER, -1)
-        cv2.line(img, (0, header_h), (w, header_h), (255, 255, 255), 3)
-
-        self._draw_text_with_outline(img, "AIR RUNNER", (20, 42), 1.0, self.C_ACCENT, 2)
-
-        (logo_w, _), _ = cv2.getTextSize("AIR RUNNER", cv2.FONT_HERSHEY_SIMPLEX, 1.0, 2)
-        hint_x = 20 + logo_w + 15
-        cv2.putText(img, "[ESC to EXIT]", (hint_x, 42), cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.C_TEXT_MAIN, 1)
-
         if action != "NEUTRAL":
             text = action
             font_scale = 1.2
             thickness = 3
-            (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+            (tw, th), _ = text_size(text, font_scale, thickness)
             cx = (w - tw) // 2
             pad_x, pad_y = 20, 10
             cv2.rectangle(img, (cx - pad_x, 15), (cx + tw + pad_x, 15 + th + pad_y + 10), self.C_OK, -1)
@@ -140,21 +220,41 @@ class CyberHUD:
         fps_text = f"FPS: {int(self.fps)}"
         self._draw_text_with_outline(img, fps_text, (w - 130, 42), 0.6, self.C_OK, 2)
 
+    # 分阶段延迟面板 (p50 / p95 / p99, 单位ms)
+    def draw_latency_panel(self, img, summary):
+        if not summary:
+            return img
+        h, w, _ = img.shape
+        line_h = 18
+        panel_w = 250
+        panel_h = 26 + line_h * len(summary)
+        x0, y0 = 10, max(0, h - panel_h - 10)
+
+        blend_color(img[y0:y0 + panel_h, x0:x0 + panel_w], (30, 30, 30), 0.6)
+
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        cols = [x0 + 8, x0 + 110, x0 + 158, x0 + 206]
+        for x, text in zip(cols, ["STAGE", "P50", "P95", "P99"]):
+            cv2.putText(img, text, (x, y0 + 16), font, 0.42, self.C_ACCENT, 1)
+        for i, (name, s) in enumerate(summary.items()):
+            y = y0 + 16 + line_h * (i + 1)
+            values = [name, f"{s['p50']:.1f}", f"{s['p95']:.1f}", f"{s['p99']:.1f}"]
+            for x, text in zip(cols, values):
+                cv2.putText(img, text, (x, y), font, 0.42, self.C_TEXT_MAIN, 1)
+        return img
+
     def _draw_countdown(self, img, num):
         h, w, _ = img.shape
-        overlay = img.copy()
-        cv2.rectangle(overlay, (0, 0), (w, h), (255, 255, 255), -1)
-        cv2.addWeighted(overlay, 0.5, img, 0.5, 0, img)
+        blend_color(img, (255, 255, 255), 0.5)
 
         text = str(int(num) + 1)
-        font = cv2.FONT_HERSHEY_SIMPLEX
         scale, thick = 6, 15
-        size = cv2.getTextSize(text, font, scale, thick)[0]
+        size = text_size(text, scale, thick)[0]
         cx, cy = (w - size[0]) // 2, (h + size[1]) // 2 - 20
         self._draw_text_with_outline(img, text, (cx, cy), scale, self.C_ACCENT, 5)
 
         sub_text = "GET READY!"
         sub_scale, sub_thick = 1.5, 3
-        sub_size = cv2.getTextSize(sub_text, font, sub_scale, sub_thick)[0]
+        sub_size = text_size(sub_text, sub_scale, sub_thick)[0]
         sub_x = (w - sub_size[0]) // 2
         self._draw_text_with_outline(img, sub_text, (sub_x, cy + 80), sub_scale, self.C_WARN, sub_thick)
\ No newline at end of file
@@ -0,0 +1,135 @@
+import fcntl
+import os
+import stat
+import struct
+import time
+
+# Linux输入事件编码 (linux/input-event-codes.h)，覆盖GameAdapter.KEY_MAPS用到的按键
+KEY_CODES = {
+    "esc": 1,
+    "w": 17,
+    "a": 30,
+    "s": 31,
+    "d": 32,
+    "up": 103,
+    "left": 105,
+    "right": 106,
+    "down": 108,
+    "f24": 194,  # 基准测试用，不影响桌面和游戏
+}
+
+EV_SYN = 0
+EV_KEY = 1
+SYN_REPORT = 0
+
+UI_SET_EVBIT = 0x40045564
+UI_SET_KEYBIT = 0x40045565
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+BUS_USB = 0x03
+
+DEFAULT_DEVICE = "/dev/uinput"
+DEVICE_NAME = b"AirRunner Virtual Keyboard"
+
+# struct input_event: timeval(两个long) + type + code + value，时间填0由内核补上
+_EVENT = struct.Struct("llHHi")
+# 旧式 struct uinput_user_dev: name[80] + input_id + ff_effects_max + absmax/absmin/absfuzz/absflat[64]
+_USER_DEV = struct.Struct("80sHHHHi" + "64i" * 4)
+
+
+def _key_code(key):
+    try:
+        return KEY_CODES[key]
+    except KeyError:
+        raise ValueError(f"Unsupported key for uinput: {key}")
+
+
+def uinput_available(path=DEFAULT_DEVICE):
+    return os.path.exists(path) and os.access(path, os.W_OK)
+
+
+# 直接写 /dev/uinput 的虚拟键盘：不经过X11，按下+松开只需一次write系统调用
+# path不是字符设备时(如测试用的普通文件)跳过ioctl，只写事件流，便于在无权限环境下验证
+class UinputKeyboard:
+    PAUSE = 0
+
+    def __init__(self, path=DEFAULT_DEVICE):
+        self.path = path
+        self.fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        self.is_device = stat.S_ISCHR(os.fstat(self.fd).st_mode)
+        if self.is_device:
+            try:
+                self._create_device()
+            except OSError:
+                os.close(self.fd)
+                raise
+
+    def _create_device(self):
+        fcntl.ioctl(self.fd, UI_SET_EVBIT, EV_KEY)
+        for code in KEY_CODES.values():
+            fcntl.ioctl(self.fd, UI_SET_KEYBIT, code)
+        zeros = [0] * 256
+        os.write(self.fd, _USER_DEV.pack(DEVICE_NAME, BUS_USB, 0x1, 0x1, 1, 0, *zeros))
+        fcntl.ioctl(self.fd, UI_DEV_CREATE)
+        # 新设备需要一点时间被桌面环境识别，否则最初几次按键会丢
+        time.sleep(0.1)
+
+    def _write(self, *events):
+        os.write(self.fd, b"".join(_EVENT.pack(0, 0, t, c, v) for t, c, v in events))
+
+    def keyDown(self, key):
+        self._write((EV_KEY, _key_code(key), 1), (EV_SYN, SYN_REPORT, 0))
+
+    def keyUp(self, key):
+        self._write((EV_KEY, _key_code(key), 0), (EV_SYN, SYN_REPORT, 0))
+
+    def press(self, key):
+        code = _key_code(key)
+        self._write((EV_KEY, code, 1), (EV_SYN, SYN_REPORT, 0), (EV_KEY, code, 0), (EV_SYN, SYN_REPORT, 0))
+
+    def close(self):
+        if self.fd is None:
+            return
+        if self.is_device:
+            try:
+                fcntl.ioctl(self.fd, UI_DEV_DESTROY)
+            except OSError:
+                pass
+        os.close(self.fd)
+        self.fd = None
+
+
+# 安装了python-evdev时使用它创建虚拟键盘，接口同上
+class EvdevKeyboard:
+    PAUSE = 0
+
+    def __init__(self, path=DEFAULT_DEVICE):
+        from evdev import UInput, ecodes
+        self.ecodes = ecodes
+        self.ui = UInput({ecodes.EV_KEY: list(KEY_CODES.values())}, name=DEVICE_NAME.decode(), devnode=path)
+        time.sleep(0.1)
+
+    def keyDown(self, key):
+        self.ui.write(self.ecodes.EV_KEY, _key_code(key), 1)
+        self.ui.syn()
+
+    def keyUp(self, key):
+        self.ui.write(self.ecodes.EV_KEY, _key_code(key), 0)
+        self.ui.syn()
+
+    def press(self, key):
+        code = _key_code(key)
+        self.ui.write(self.ecodes.EV_KEY, code, 1)
+        self.ui.syn()
+        self.ui.write(self.ecodes.EV_KEY, code, 0)
+        self.ui.syn()
+
+    def close(self):
+        self.ui.close()
+
+
+def read_events(path):
+    # 解析写入模拟设备文件的事件流，返回 [(type, code, value), ...]
+    with open(path, "rb") as f:
+        data = f.read()
+    return [_EVENT.unpack_from(data, i)[2:] for i in range(0, len(data) - _EVENT.size + 1, _EVENT.size)]
@@ -1,16 +1,16 @@
 import json
 import os
-import threading
 import sys
 import time
-import csv
-from datetime import datetime
+import atexit
+import threading
 import sys
 import os
 
 # 配置管理
 CONFIG_FILE = "user_config.json"
-HISTORY_FILE = "game_history.csv"  # 历史记录文件
+HISTORY_FILE = "game_history.csv"  # 旧版历史记录，首次启动时导入数据库
+HISTORY_DB_FILE = "game_history.db"  # 历史记录数据库(SQLite)
 
 DEFAULT_CONFIG = {
     "jump_thresh": 0.4,
@@ -19,7 +19,29 @@ DEFAULT_CONFIG = {
     "right_thresh": 0.6,
     "camera_index": 0,
     "theme_mode": "Light",
-    "sound_enabled": True
+    "sound_enabled": True,
+    "show_latency_panel": False,  # HUD延迟面板，游戏中按L切换
+    "latency_export": False,  # 结束时导出延迟统计 CSV/JSON
+    "record_landmarks": "",  # 非空时把每帧关键点录制到该 .npz 文件
+    "telemetry_enabled": False,  # 逐帧遥测(坐标/原始与过滤后动作/是否按键/各阶段耗时)，排查漏触发用
+    "telemetry_dir": "telemetry",  # 每局一个文件，装了pyarrow时为 .parquet，否则 .npz
+    "roi_enabled": False,  # 只对目标附近区域推理
+    "roi_size": 0.5,
+    "roi_margin": 0.1,
+    "roi_search_interval": 30,  # 每隔N帧回退一次全图搜索
+    "governor_enabled": True,  # 推理耗时超出预算时自动降分辨率/隔帧推理
+    "latency_budget_ms": 30,
+    "inference_backend": "thread",  # "process": 推理放到独立进程(共享内存传帧)
+    "filter_enabled": True,  # 关键点平滑 + 阈值滞回，减少阈值附近的误触
+    "filter_min_cutoff": 1.0,
+    "filter_beta": 10.0,
+    "hysteresis_band": 0.03,
+    "filter_cooldown": 0.08,  # 开启滤波后使用的按键冷却(秒)
+    "predictive_enabled": False,  # 按关键点速度预测，提前触发动作
+    "predict_lookahead_ms": 100,
+    "predict_min_speed": 0.5,  # 速度低于该值(画面比例/秒)不预测，避免抖动误触
+    "input_backend": "",  # 空为自动选择；Linux下有/dev/uinput写权限时优先使用虚拟键盘
+    "uinput_device": "/dev/uinput"
 }
 
 # 资源路径处理函数
@@ -29,123 +51,314 @@ def resource_path(relative_path):
         return os.path.join(sys._MEIPASS, relative_path)
     return os.path.join(os.path.abspath("."), relative_path)
 
+# 配置读写：UI线程只更新内存中的待写配置，后台线程在停止修改一段时间后合并写盘
+# 写盘用 临时文件 + fsync + rename，中途崩溃也不会留下写了一半的配置文件
 class ConfigManager:
-    @staticmethod
-    def load():
-        if not os.path.exists(CONFIG_FILE):
+    path = CONFIG_FILE
+    DEBOUNCE = 0.5  # 最后一次修改后多久写盘(秒)
+    MAX_DELAY = 2.0  # 连续修改时最长多久必须写一次
+    writes = 0
+    written_mtime = None  # 最近一次自己写盘后文件的st_mtime_ns，轮询时据此跳过自己的写入
+
+    _cond = threading.Condition()
+    _write_lock = threading.Lock()
+    _pending = None
+    _first_change = 0
+    _deadline = 0
+    _thread = None
+
+    @classmethod
+    def load(cls):
+        if not os.path.exists(cls.path):
             return DEFAULT_CONFIG.copy()
         try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+            with open(cls.path, "r", encoding="utf-8") as f:
                 data = json.load(f)
                 for k, v in DEFAULT_CONFIG.items():
                     if k not in data:
                         data[k] = v
                 return data
-        except:
+        except Exception as e:
+            # 损坏的配置另存一份再使用默认值，不直接被下次保存覆盖
+            print(f"Config Load Error: {e}")
+            try:
+                os.replace(cls.path, cls.path + ".bad")
+            except OSError:
+                pass
             return DEFAULT_CONFIG.copy()
 
-    @staticmethod
-    def save(config_data):
+    @classmethod
+    def _write_atomic(cls, config_data):
+        tmp_path = cls.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(config_data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, cls.path)
+        cls.written_mtime = os.stat(cls.path).st_mtime_ns
+        cls.writes += 1
+
+    @classmethod
+    def save(cls, config_data):
+        # 同步写盘，会阻塞调用线程；UI中请用save_async
+        with cls._write_lock:
+            with cls._cond:
+                cls._pending = None
+            try:
+                cls._write_atomic(config_data)
+            except Exception as e:
+                print(f"Config Save Error: {e}")
+
+    @classmethod
+    def save_async(cls, config_data):
+        now = time.monotonic()
+        with cls._cond:
+            if cls._pending is None:
+                cls._first_change = now
+            cls._pending = dict(config_data)
+            cls._deadline = min(now + cls.DEBOUNCE, cls._first_change + cls.MAX_DELAY)
+            if cls._thread is None:
+                cls._thread = threading.Thread(target=cls._writer, daemon=True)
+                cls._thread.start()
+                atexit.register(cls.flush)  # 退出前写完尚未落盘的修改
+            cls._cond.notify()
+
+    @classmethod
+    def is_own(cls, path, mtime):
+        # path上mtime对应的内容是否来自本程序：自己刚写的，或还有待写修改(磁盘比内存旧)
+        if path is None or os.path.abspath(path) != os.path.abspath(cls.path):
+            return False
+        with cls._cond:
+            pending = cls._pending is not None
+        return pending or mtime == cls.written_mtime
+
+    @classmethod
+    def _writer(cls):
+        while True:
+            with cls._cond:
+                cls._cond.wait_for(lambda: cls._pending is not None)
+                delay = cls._deadline - time.monotonic()
+                if delay > 0:
+                    cls._cond.wait(delay)
+                    continue
+            cls.flush()
+
+    @classmethod
+    def flush(cls):
+        # 立即写入待写配置；在写盘锁内取出，返回时磁盘上一定是最新的
+        with cls._write_lock:
+            with cls._cond:
+                data, cls._pending = cls._pending, None
+            if data is None:
+                return
+            try:
+                cls._write_atomic(data)
+            except Exception as e:
+                print(f"Config Save Error: {e}")
+
+
+# 共享设置：带版本号的设置，UI修改或配置文件在磁盘上被改动时版本号加一
+# 运行中的游戏循环每帧只比较版本号，变化时才取一次新快照
+class SharedSettings:
+    def __init__(self, data, path=None, poll_interval=0.5):
+        self._lock = threading.Lock()
+        self._data = dict(data)
+        self.version = 0
+        self.path = path  # 监视的配置文件，None则不轮询
+        self.poll_interval = poll_interval
+        self._mtime = self._stat()
+        self._next_poll = 0
+
+    def _stat(self):
         try:
-            with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-                json.dump(config_data, f, indent=4)
-        except Exception as e:
-            print(f"Config Save Error: {e}")
+            return os.stat(self.path).st_mtime_ns
+        except (OSError, TypeError):
+            return None
+
+    def snapshot(self):
+        with self._lock:
+            return self.version, dict(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default)
 
+    def update(self, changes):
+        # 只有值真的变化时才升版本，返回是否有变化
+        with self._lock:
+            changed = {k: v for k, v in changes.items() if k not in self._data or self._data[k] != v}
+            if not changed:
+                return False
+            self._data.update(changed)
+            self.version += 1
+            return True
 
-# 历史记录管理器
+    def poll(self):
+        # 按mtime轮询配置文件(手动编辑等外部修改)，两次轮询间隔内直接返回
+        now = time.monotonic()
+        if self.path is None or now < self._next_poll:
+            return False
+        self._next_poll = now + self.poll_interval
+        mtime = self._stat()
+        if mtime is None or mtime == self._mtime:
+            return False
+        # 自己防抖写盘的结果不算外部修改，否则拖动滑块时会把磁盘上较旧的值读回来
+        if ConfigManager.is_own(self.path, mtime):
+            if mtime == ConfigManager.written_mtime:
+                self._mtime = mtime
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False  # 可能正被非原子地写入，下次轮询再读
+        self._mtime = mtime
+        return self.update(data)
+
+
+# 历史记录管理器：接口保持不变，存储由history_store.HistoryStore负责
 class HistoryManager:
-    @staticmethod
-    def save_session(stats):
-        # 将单次游戏数据追加到CSV
-        file_exists = os.path.isfile(HISTORY_FILE)
+    path = HISTORY_DB_FILE
+    csv_path = HISTORY_FILE
+    _store = None
+
+    @classmethod
+    def store(cls):
+        # 第一次使用时才打开数据库(并导入旧CSV)，不拖慢启动
+        if cls._store is None:
+            from history_store import HistoryStore
+            cls._store = HistoryStore(cls.path, migrate_from=cls.csv_path)
+        return cls._store
+
+    @classmethod
+    def save_session(cls, stats):
         try:
-            with open(HISTORY_FILE, "a", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                # 如果是新文件，先写表头
-                if not file_exists:
-                    writer.writerow(["Date", "Duration", "Jump", "Duck", "Left", "Right", "Total_Actions"])
-
-                total_actions = stats.get("JUMP", 0) + stats.get("DUCK", 0) + stats.get("LEFT", 0) + stats.get("RIGHT",
-                                                                                                               0)
-                writer.writerow([
-                    datetime.now().strftime("%Y-%m-%d %H:%M"),
-                    stats.get("TOTAL_TIME", 0),
-                    stats.get("JUMP", 0),
-                    stats.get("DUCK", 0),
-                    stats.get("LEFT", 0),
-                    stats.get("RIGHT", 0),
-                    total_actions
-                ])
+            cls.store().add(stats)
         except Exception as e:
             print(f"History Save Error: {e}")
 
-    @staticmethod
-    def load_recent(limit=7):
-        # 读取最近N次的游戏记录用于绘图
-        if not os.path.exists(HISTORY_FILE):
+    @classmethod
+    def load_recent(cls, limit=7):
+        # 读取最近N次的游戏记录用于绘图，只读N行
+        try:
+            return cls.store().recent(limit)
+        except Exception as e:
+            print(f"History Load Error: {e}")
             return []
+
+    @classmethod
+    def load_range(cls, start=None, end=None):
         try:
-            data = []
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    data.append(row)
-            return data[-limit:]  # 返回最后N条
+            return cls.store().range(start, end)
         except Exception as e:
             print(f"History Load Error: {e}")
             return []
 
+    @classmethod
+    def weekly_totals(cls, start=None, end=None):
+        try:
+            return cls.store().weekly(start, end)
+        except Exception as e:
+            print(f"History Load Error: {e}")
+            return []
+
+    @classmethod
+    def action_totals(cls, start=None, end=None):
+        try:
+            return cls.store().totals(start, end)
+        except Exception as e:
+            print(f"History Load Error: {e}")
+            return {}
+
 
-# 音效管理
+# 音效管理：启动时一次性解码所有音效，播放时只在固定的通道池里选通道，不建线程、不读盘
 class AudioManager:
+    SOUND_FILES = {
+        "notify": "beep.mp3",
+        "countdown": "beep.mp3",
+        "alert": "beep.mp3",
+        "success": "success.mp3",
+        "start": "success.mp3",
+        "JUMP": "success.mp3",
+        "DUCK": "success.mp3",
+        "LEFT": "success.mp3",
+        "RIGHT": "success.mp3",
+        "PAUSE": "beep.mp3"
+    }
+    ACTION_SOUNDS = ["JUMP", "DUCK", "LEFT", "RIGHT"]
+    NUM_CHANNELS = 4
+
+    enabled = True
     _mixer_initialized = False
+    _init_failed = False
+    _sounds = {}  # 音效类型 -> 解码后的pygame.mixer.Sound
+    _channels = []
+    _started = []  # 各通道开始播放的时间，全部占用时抢占最早的
 
     @classmethod
-    def _init_mixer(cls):
-        if not cls._mixer_initialized:
-            try:
-                os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
-                import pygame
-                pygame.mixer.init()
-                cls._mixer_initialized = True
-            except:
-                pass
-
-    @staticmethod
-    def play(sound_type):
-        AudioManager._init_mixer()
-        if not AudioManager._mixer_initialized: return
+    def init(cls, enabled=True):
+        # 在程序启动时调用；enabled=False时整个音效引擎不初始化，play直接返回
+        cls.enabled = enabled
+        if not enabled or cls._mixer_initialized or cls._init_failed:
+            return
+        try:
+            os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+            import pygame
+            pygame.mixer.init()
+            pygame.mixer.set_num_channels(cls.NUM_CHANNELS)
+            cls._channels = [pygame.mixer.Channel(i) for i in range(cls.NUM_CHANNELS)]
+            cls._started = [0.0] * cls.NUM_CHANNELS
 
-        import pygame
-        def _worker():
-            try:
-                sound_map = {
-                    "notify": "beep.mp3",
-                    "countdown": "beep.mp3",
-                    "alert": "beep.mp3",
-                    "success": "success.mp3",
-                    "start": "success.mp3",
-                    "JUMP": "success.mp3",
-                    "DUCK": "success.mp3",
-                    "LEFT": "success.mp3",
-                    "RIGHT": "success.mp3",
-                    "PAUSE": "beep.mp3"
-                }
-
-                # 使用resource_path获取真实路径
-                raw_filename = sound_map.get(sound_type)
-                if raw_filename:
+            # 同一个文件只解码一次
+            decoded = {}
+            for sound_type, raw_filename in cls.SOUND_FILES.items():
+                if raw_filename not in decoded:
                     filename = resource_path(raw_filename)
+                    decoded[raw_filename] = pygame.mixer.Sound(filename) if os.path.exists(filename) else None
+                if decoded[raw_filename] is not None:
+                    cls._sounds[sound_type] = decoded[raw_filename]
+            cls._mixer_initialized = True
+        except Exception as e:
+            cls._init_failed = True
+            print(f"Audio Init Error: {e}")
 
-                    if os.path.exists(filename):
-                        sound = pygame.mixer.Sound(filename)
-                        if sound_type in ["JUMP", "DUCK", "LEFT", "RIGHT"]:
-                            sound.set_volume(0.8)
-                        else:
-                            sound.set_volume(1.0)
-                        sound.play()
-            except Exception:
-                pass
+    @classmethod
+    def set_enabled(cls, enabled):
+        cls.enabled = enabled
+        if enabled:
+            cls.init(True)
+        else:
+            cls.stop_all()
+
+    @classmethod
+    def _pick_channel(cls):
+        # 优先空闲通道，全部占用时抢占最早开始播放的通道
+        for i, channel in enumerate(cls._channels):
+            if not channel.get_busy():
+                return i
+        return min(range(len(cls._started)), key=cls._started.__getitem__)
+
+    @classmethod
+    def play(cls, sound_type):
+        if not cls.enabled:
+            return
+        if not cls._mixer_initialized:
+            cls.init(True)
+            if not cls._mixer_initialized:
+                return
+        sound = cls._sounds.get(sound_type)
+        if sound is None:
+            return
+        try:
+            i = cls._pick_channel()
+            channel = cls._channels[i]
+            channel.play(sound)
+            channel.set_volume(0.8 if sound_type in cls.ACTION_SOUNDS else 1.0)
+            cls._started[i] = time.perf_counter()
+        except Exception:
+            pass
 
-        threading.Thread(target=_worker, daemon=True).start()
\ No newline at end of file
+    @classmethod
+    def stop_all(cls):
+        for channel in cls._channels:
+            channel.stop()
\ No newline at end of file